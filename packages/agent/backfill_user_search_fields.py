@@ -0,0 +1,57 @@
+"""
+ASP Cranes user search field backfill
+
+One-off script that adds the lowercase nameLower/emailLower fields to users
+written before they existed, so the indexed prefix lookups in
+FirebaseService.get_user_by_id can find them. New and updated users already
+get these fields on write; run this once per project, then again only if
+users are imported outside the agent.
+
+Usage:
+    python backfill_user_search_fields.py [--dryrun]
+"""
+
+import argparse
+
+from sales_service.integrations.firebase_service import firebase_service, user_search_fields
+
+# Firestore accepts at most 500 writes per batch
+BATCH_SIZE = 500
+
+def backfill(dryrun=False):
+    """Set missing or stale nameLower/emailLower fields; returns the number of users updated"""
+    db = firebase_service.db
+    batch = db.batch()
+    pending = updated = 0
+    for doc in db.collection('users').select(['name', 'email', 'nameLower', 'emailLower']).stream():
+        data = doc.to_dict()
+        fields = {key: value for key, value in user_search_fields(data).items()
+                  if data.get(key) != value}
+        if not fields:
+            continue
+        updated += 1
+        print(f"{'Would update' if dryrun else 'Updating'} user {doc.id}: {', '.join(fields)}")
+        if dryrun:
+            continue
+        batch.update(doc.reference, fields)
+        pending += 1
+        if pending == BATCH_SIZE:
+            batch.commit()
+            batch, pending = db.batch(), 0
+    if pending:
+        batch.commit()
+    return updated
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the lowercase user search fields")
+    parser.add_argument("--dryrun", action="store_true", help="Show what would be done without making changes")
+    args = parser.parse_args()
+
+    if args.dryrun:
+        print("*** DRY RUN MODE - No changes will be made ***\n")
+
+    updated = backfill(args.dryrun)
+    print(f"\n{updated} user(s) {'need' if args.dryrun else 'were'} updated")
+
+if __name__ == "__main__":
+    main()
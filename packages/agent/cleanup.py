@@ -7,17 +7,20 @@ This script helps you organize your project by:
 3. Organizing the directory structure
 
 Usage:
-    python cleanup.py [--dryrun]
+    python cleanup.py [--dryrun] [--no-native]
 """
 
 import os
+import sys
+import stat
 import shutil
 import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Define paths
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
-BACKUP_DIR = os.path.join(os.path.dirname(ROOT_DIR), "ASP-Cranes-Agent-Backup-" + datetime.now().strftime("%Y%m%d%H%M%S"))
 
 # Files to remove
 FILES_TO_REMOVE = [
@@ -34,19 +37,188 @@ DIRS_TO_ARCHIVE = [
     "attached_assets"
 ]
 
+# Timestamped backup location next to the project root (computed per run)
+def _make_backup_dir():
+    return os.path.join(os.path.dirname(ROOT_DIR), "ASP-Cranes-Agent-Backup-" + datetime.now().strftime("%Y%m%d%H%M%S"))
+
+# Copy a single file, letting the kernel move the data where possible
+def fast_copy2(src, dst, *, follow_symlinks=True, src_stat=None):
+    """Drop-in replacement for shutil.copy2 that avoids userspace buffers.
+
+    Uses os.copy_file_range on Linux (reflink/server-side copy on btrfs, xfs
+    and NFS) and CopyFileW on Windows; anything else goes through
+    shutil.copy2, which already uses sendfile/fcopyfile on Linux/macOS.
+    Pass src_stat (e.g. a cached DirEntry.stat()) to skip re-stat-ing src.
+    """
+    if sys.platform == "win32":
+        import ctypes
+        # CopyFileW preserves timestamps and attributes itself
+        if ctypes.windll.kernel32.CopyFileW(str(src), str(dst), False):
+            return dst
+    elif hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                if src_stat is None:
+                    src_stat = os.fstat(fsrc.fileno())
+                remaining = src_stat.st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                # Apply metadata from the stat we already hold instead of copystat()
+                os.chmod(fdst.fileno(), stat.S_IMODE(src_stat.st_mode))
+            os.utime(dst, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+            return dst
+        except OSError:
+            pass
+    return shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
+
+# Copy a directory tree, preferring a native copy-on-write clone
+def _fast_copytree(src, dst, workers=16, exclude=()):
+    """Copy src to dst using the fastest method available on this platform.
+
+    Tries a native clone first (reflink on Linux, APFS clonefile on macOS,
+    multi-threaded robocopy on Windows) and falls back to a thread pool that
+    dispatches one fast_copy2 per file. Top-level names in exclude are
+    skipped.
+    """
+    exclude = set(exclude)
+    if sys.platform == "win32":
+        cmd = ["robocopy", src, dst, "/MT:32", "/E", "/NFL", "/NDL"]
+        if exclude:
+            cmd += ["/XD"] + [os.path.join(src, name) for name in exclude]
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        # robocopy exit codes 0 and 1 mean "nothing to copy" and "copied"
+        if result.returncode <= 1:
+            return
+    elif shutil.which("cp"):
+        if exclude:
+            sources = [os.path.join(src, name) for name in sorted(os.listdir(src))
+                       if name not in exclude]
+            os.makedirs(dst, exist_ok=True)
+        else:
+            sources = [os.path.join(src, "")] if sys.platform == "darwin" else [os.path.join(src, ".")]
+        if not sources:
+            shutil.copystat(src, dst)
+            return
+        if sys.platform == "darwin":
+            cmd = ["cp", "-cR"] + sources + [dst]
+        else:
+            cmd = ["cp", "--reflink=auto", "-a"] + sources + [dst]
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if result.returncode == 0:
+            shutil.copystat(src, dst)
+            return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = []
+
+        def walk(src_dir, dst_dir, skip=()):
+            os.makedirs(dst_dir, exist_ok=True)
+            with os.scandir(src_dir) as it:
+                for entry in it:
+                    if entry.name in skip:
+                        continue
+                    dst_path = os.path.join(dst_dir, entry.name)
+                    if entry.is_dir(follow_symlinks=False):
+                        walk(entry.path, dst_path)
+                    elif entry.is_symlink():
+                        os.symlink(os.readlink(entry.path), dst_path)
+                    else:
+                        # DirEntry caches stat(), so each file is stat-ed once
+                        futures.append(executor.submit(fast_copy2, entry.path, dst_path,
+                                                       src_stat=entry.stat(follow_symlinks=False)))
+
+        walk(src, dst, exclude)
+        # Surface any copy errors
+        for future in futures:
+            future.result()
+    shutil.copystat(src, dst)
+
+# Number of files unlinked per thread-pool task
+RMTREE_CHUNK_SIZE = 512
+
+def _unlink_all(paths):
+    for path in paths:
+        os.unlink(path)
+
+# Remove a directory tree by unlinking files across a thread pool
+def _parallel_rmtree(root, workers=8):
+    """Delete root recursively without native tools.
+
+    Files are unlinked in chunks of RMTREE_CHUNK_SIZE on a thread pool, then
+    directories are removed bottom-up on the calling thread once empty.
+    """
+    files = []
+    dirs = []
+
+    def walk(dir_path):
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    walk(entry.path)
+                else:
+                    files.append(entry.path)
+        dirs.append(dir_path)
+
+    walk(root)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_unlink_all, files[i:i + RMTREE_CHUNK_SIZE])
+                   for i in range(0, len(files), RMTREE_CHUNK_SIZE)]
+        for future in futures:
+            future.result()
+
+    # Post-order: children were appended before their parents
+    for dir_path in dirs:
+        os.rmdir(dir_path)
+
+# Remove a directory tree using native tools where available
+def _fast_rmtree(path, use_native=True):
+    """Delete path recursively, dispatching to rm/rd before falling back to a threaded walk."""
+    if not use_native:
+        _parallel_rmtree(path)
+        return
+    try:
+        if sys.platform == "win32":
+            subprocess.check_call(["cmd", "/c", "rd", "/s", "/q", path])
+            return
+        if shutil.which("rm"):
+            subprocess.check_call(["rm", "-rf", path])
+            return
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"  Native removal failed ({e}), falling back to threaded removal")
+    _parallel_rmtree(path)
+
 # Function to create backup
-def create_backup(root_dir, backup_dir, dryrun=False):
+def create_backup(root_dir, backup_dir, dryrun=False, exclude=DIRS_TO_ARCHIVE):
     print(f"Creating backup of {root_dir} to {backup_dir}")
     if not dryrun:
-        shutil.copytree(root_dir, backup_dir)
+        # Fail fast on permission/quota problems before walking the source tree
+        backup_parent = os.path.dirname(backup_dir)
+        os.makedirs(backup_parent, exist_ok=True)
+        if not os.access(backup_parent, os.W_OK):
+            raise PermissionError(f"Backup location is not writable: {backup_parent}")
+        os.mkdir(backup_dir)
+        
+        # Archived directories are moved into the backup later, not copied
+        _fast_copytree(root_dir, backup_dir, exclude=exclude)
     print(f"{'Would have created' if dryrun else 'Created'} backup at: {backup_dir}")
 
+# Snapshot the top-level entries of a directory in a single scandir pass
+def _scan_entries(root_dir):
+    with os.scandir(root_dir) as it:
+        return {entry.name: entry for entry in it}
+
 # Function to remove files
-def remove_files(files_to_remove, dryrun=False):
+def remove_files(files_to_remove, dryrun=False, entries=None):
     print("\nRemoving unnecessary files:")
+    if entries is None:
+        entries = _scan_entries(ROOT_DIR)
     for file_path in files_to_remove:
         abs_path = os.path.join(ROOT_DIR, file_path)
-        if os.path.exists(abs_path):
+        if file_path in entries:
             print(f"  {'Would remove' if dryrun else 'Removing'}: {file_path}")
             if not dryrun:
                 os.remove(abs_path)
@@ -54,21 +226,26 @@ def remove_files(files_to_remove, dryrun=False):
             print(f"  Skipping (not found): {file_path}")
 
 # Function to archive directories
-def archive_dirs(dirs_to_archive, dryrun=False):
+def archive_dirs(dirs_to_archive, backup_dir, dryrun=False, use_native=True, entries=None):
     print("\nArchiving directories:")
+    if entries is None:
+        entries = _scan_entries(ROOT_DIR)
     for dir_name in dirs_to_archive:
         src_path = os.path.join(ROOT_DIR, dir_name)
-        if os.path.exists(src_path) and os.path.isdir(src_path):
+        if dir_name in entries and entries[dir_name].is_dir():
             # Create equivalent path in backup
             rel_path = os.path.relpath(src_path, ROOT_DIR)
-            dst_path = os.path.join(BACKUP_DIR, rel_path)
+            dst_path = os.path.join(backup_dir, rel_path)
             
             print(f"  {'Would archive' if dryrun else 'Archiving'}: {dir_name}")
             if not dryrun:
-                # Remove from backup dir (it was copied earlier)
-                if os.path.exists(dst_path):
-                    # Directory exists in backup, now remove the original
-                    shutil.rmtree(src_path)
+                try:
+                    # Same filesystem: a single directory-entry update
+                    os.rename(src_path, dst_path)
+                except OSError:
+                    # Cross-filesystem: copy into the backup, then remove the original
+                    _fast_copytree(src_path, dst_path)
+                    _fast_rmtree(src_path, use_native)
         else:
             print(f"  Skipping (not found): {dir_name}")
 
@@ -76,6 +253,7 @@ def archive_dirs(dirs_to_archive, dryrun=False):
 def main():
     parser = argparse.ArgumentParser(description="Clean up the ASP Cranes project structure")
     parser.add_argument("--dryrun", action="store_true", help="Show what would be done without making changes")
+    parser.add_argument("--no-native", action="store_true", help="Don't shell out to rm/rd when removing archived directories")
     args = parser.parse_args()
     
     if args.dryrun:
@@ -93,16 +271,20 @@ def main():
             return
     
     # Create backup first
-    create_backup(ROOT_DIR, BACKUP_DIR, args.dryrun)
+    backup_dir = _make_backup_dir()
+    create_backup(ROOT_DIR, backup_dir, args.dryrun)
+    
+    # Scan the project root once; DirEntry caches the type lookups below
+    entries = _scan_entries(ROOT_DIR)
     
     # Remove unnecessary files
-    remove_files(FILES_TO_REMOVE, args.dryrun)
+    remove_files(FILES_TO_REMOVE, args.dryrun, entries)
     
     # Archive directories
-    archive_dirs(DIRS_TO_ARCHIVE, args.dryrun)
+    archive_dirs(DIRS_TO_ARCHIVE, backup_dir, args.dryrun, not args.no_native, entries)
     
     print("\nCleanup complete!")
-    print(f"Backup created at: {BACKUP_DIR}")
+    print(f"Backup created at: {backup_dir}")
     print("\nNext steps:")
     print("  1. Review the backup to ensure nothing important was removed")
     print("  2. If needed, restore any files from the backup")
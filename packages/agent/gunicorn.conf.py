@@ -0,0 +1,32 @@
+"""
+Gunicorn settings for serving robust_api_server in production.
+
+Usage:
+    gunicorn robust_api_server:app
+
+Each /agent/chat request blocks its thread while the agent talks to the model,
+so threaded (gthread) workers let many chats run at once. The app is imported
+in every worker after the fork (no preload_app), which gives each worker its
+own agent event loop thread and database clients.
+
+Chat sessions live in the agent's InMemorySessionService, so they belong to the
+worker that created them. Keep a single worker and scale with threads (the
+default) unless the sessions move to a shared store or the load balancer pins
+each user to one worker; with several workers and neither, follow-up messages
+land on a worker that has never seen the session and the conversation restarts.
+
+Author: ASP Cranes Agent Team
+Date: 2025
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+worker_class = 'gthread'
+# One worker: sessions are in process memory (see above)
+workers = int(os.environ.get('WEB_CONCURRENCY', '1'))
+threads = int(os.environ.get('GUNICORN_THREADS', '16'))
+
+# Agent turns with several tool calls can take well over gunicorn's 30s default
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+keepalive = 5
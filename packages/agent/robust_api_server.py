@@ -6,13 +6,18 @@ Contains improved event handling, debug logging, and response extraction
 import os
 import asyncio
 import logging
-import uuid
-import nest_asyncio
-import json
+import secrets
+import threading
+import orjson
 import re
+import io
+import hashlib
+import atexit
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 
-from flask import Flask, request, make_response, jsonify
+from flask import Flask, request, make_response
 from flask_cors import CORS
 
 # Import the agent and necessary ADK components
@@ -20,14 +25,25 @@ from sales_service.agent import root_agent
 from sales_service.integrations.crm_sync import crm_sync
 from sales_service.integrations.database_service import DatabaseServiceFactory
 from sales_service.tools.tools import get_user_info
-from sales_service.config import Config
+from sales_service.config import get_config
 
 from google.adk.runners import Runner
 from google.adk.sessions.in_memory_session_service import InMemorySessionService
 from google.genai import types
 
-# Allow asyncio in nested environments (important for Flask + async)
-nest_asyncio.apply()
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# All agent runs share one long-lived event loop per worker on a background
+# thread; Flask request threads hand coroutines to it instead of nesting loops
+# with nest_asyncio. The model client's pooled connections belong to the loop
+# that opened them, so they must not be spread over per-request loops. The
+# agent's blocking tools and callbacks run on worker threads (see agent.py),
+# so a slow Firestore or CRM call never stalls the other chats on this loop.
+agent_loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+threading.Thread(target=agent_loop.run_forever, name='agent-loop', daemon=True).start()
 
 # Initialize database service
 db_service = DatabaseServiceFactory.get_default_service()
@@ -43,15 +59,107 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Records are written to the configured handlers by a listener thread, so
+# request threads and the agent loop never block on log I/O
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, *logging.getLogger().handlers, respect_handler_level=True)
+logging.getLogger().handlers = [QueueHandler(_log_queue)]
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 # Load configuration
-config = Config()
+config = get_config()
+# Read on every request, so bind it once
+APP_NAME = config.app_name
+
+def _json_response(obj, status=200):
+    """Build a JSON response, serialized with orjson straight to bytes"""
+    return make_response(orjson.dumps(obj), status, {'Content-Type': 'application/json'})
+
+def _request_json():
+    """Parse the request body with orjson (None when the body is empty)"""
+    body = request.get_data()
+    return orjson.loads(body) if body else None
+
+_GREETINGS = frozenset({"hi", "hello", "hey", "hola", "greetings"})
+
+# Messages asking about equipment get a nudge towards get_available_equipment
+_EQUIPMENT_KEYWORDS = re.compile(r'\b(equipment|cranes?|machines?|rent(?:al)?|available)\b', re.IGNORECASE)
+
+# Concurrent chats share user lookups: requests arriving within USER_BATCH_WINDOW
+# seconds are collected on the agent loop, deduplicated by user_id and fetched
+# in parallel on the default executor
+USER_BATCH_WINDOW = 0.005
+_pending_users = {}
+
+async def _load_user(user_id):
+    """Get a user through the lookup batcher (runs on agent_loop)"""
+    loop = asyncio.get_running_loop()
+    if not _pending_users:
+        loop.call_later(USER_BATCH_WINDOW, _dispatch_users)
+    future = loop.create_future()
+    _pending_users.setdefault(user_id, []).append(future)
+    return await future
+
+def _dispatch_users():
+    """Start fetching every user queued since the last dispatch"""
+    pending = dict(_pending_users)
+    _pending_users.clear()
+    asyncio.ensure_future(_resolve_users(pending))
+
+async def _resolve_users(pending):
+    """Fetch each distinct user once and fan the result out to its waiters"""
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(
+        *(loop.run_in_executor(None, db_service.get_user_by_id, user_id) for user_id in pending),
+        return_exceptions=True
+    )
+    for futures, result in zip(pending.values(), results):
+        for future in futures:
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+# Personalization note prepended to a signed-in user's message, by kind of message
+_USER_CONTEXT_TEMPLATES = {
+    'greet': "The user's name is {name} and their role is {role}. Greet them warmly by name.",
+    'whoami': "IMPORTANT: The user is asking about their identity. The user is {name} with the role of {role} in the system. You MUST clearly state their name and role in your response.",
+    'equipment': "IMPORTANT: The user is {name} with role {role} and is asking about equipment. Use the get_available_equipment tool to provide information about what equipment is available. Never say there's no equipment without checking.",
+    'default': "You are assisting a user with the role of {role} in the system. Their username is {name}.",
+}
+_SYSTEM_NOTE_PREFIX = "System note: "
+_CRM_CONTEXT = " You have access to the CRM system and can lookup equipment, create leads, check schedules, and access customer information. Only if directly asked 'who am I', tell them their name and role in the system."
+
+# Agent runs in flight, keyed by user, session and message: a retried duplicate that
+# arrives while the original is still running waits for it instead of starting
+# a second model round-trip
+_inflight_runs = {}
+_inflight_lock = threading.Lock()
+
+def _run_agent_once(user_id, session_id, message, content):
+    """Run the agent on agent_loop, sharing the run with identical concurrent requests"""
+    # Session IDs are client-supplied, so the user is part of the key: another user
+    # reusing a session ID must never receive this user's reply
+    key = (user_id, session_id, hashlib.blake2b(message.encode(), digest_size=16).digest())
+    with _inflight_lock:
+        future = _inflight_runs.get(key)
+        if future is None:
+            future = asyncio.run_coroutine_threadsafe(run_agent(user_id, session_id, content), agent_loop)
+            _inflight_runs[key] = future
+            future.add_done_callback(lambda _: _inflight_runs.pop(key, None))
+        else:
+            logger.info("Joining in-flight agent run for session %s", session_id)
+    return future.result()
 
 # Session and runner setup
 session_svc = InMemorySessionService()
 runner = Runner(
     agent=root_agent,
     session_service=session_svc,
-    app_name=config.app_name
+    app_name=APP_NAME
 )
 
 @app.route('/agent/chat', methods=['POST'])
@@ -62,24 +170,25 @@ def chat_with_agent():
     """
     try:
         # Extract request data
-        data = request.json
+        data = _request_json()
         if not data:
-            return jsonify({"error": "No request data provided"}), 400
+            return _json_response({"error": "No request data provided"}, 400)
             
         user_id = data.get('user_id', 'guest')
         message = data.get('message', '')
         crm_access = data.get('crm_access', False)
         
         if not message:
-            return jsonify({"error": "No message provided"}), 400
+            return _json_response({"error": "No message provided"}, 400)
             
         # Check if this is a greeting message and get user info for personalization
-        is_greeting = message.lower() in ["hi", "hello", "hey", "hola", "greetings"]
+        msg_lower = message.lower()
+        is_greeting = msg_lower in _GREETINGS
         user_info = None
         if user_id != 'guest':
             try:
                 # Get user info from Firebase
-                user_data = db_service.get_user_by_id(user_id)
+                user_data = asyncio.run_coroutine_threadsafe(_load_user(user_id), agent_loop).result()
                 if user_data:
                     user_info = {
                         "name": user_data.get("name", "Customer"),
@@ -96,35 +205,35 @@ def chat_with_agent():
         # If no session_id provided, generate one (1st message)
         session_id = data.get('session_id')
         if not session_id:
-            session_id = f"{user_id}-{uuid.uuid4()}"
+            session_id = f"{user_id}-{secrets.token_hex(16)}"
             logger.info(f"New session created: {session_id}")
             
         logger.info(f"Processing message from {user_id} (session {session_id}): {message}")            # For ALL messages from authenticated users, include user info in the context
         if user_info:
             # Different context based on message type
             if is_greeting:
-                user_context = f"The user's name is {user_info['name']} and their role is {user_info['role']}. Greet them warmly by name."
-            elif "who am i" in message.lower():
-                user_context = f"IMPORTANT: The user is asking about their identity. The user is {user_info['name']} with the role of {user_info['role']} in the system. You MUST clearly state their name and role in your response."
-            elif any(keyword in message.lower() for keyword in ["equipment", "cranes", "machines", "rent", "rental", "available"]):
-                user_context = f"IMPORTANT: The user is {user_info['name']} with role {user_info['role']} and is asking about equipment. Use the get_available_equipment tool to provide information about what equipment is available. Never say there's no equipment without checking."
+                kind = 'greet'
+            elif "who am i" in msg_lower:
+                kind = 'whoami'
+            elif _EQUIPMENT_KEYWORDS.search(message):
+                kind = 'equipment'
             else:
-                user_context = f"You are assisting a user with the role of {user_info['role']} in the system. Their username is {user_info['name']}."
+                kind = 'default'
+            user_context = _USER_CONTEXT_TEMPLATES[kind].format(**user_info)
 
             # Add CRM capabilities context for authenticated users
             if crm_access:
-                user_context += " You have access to the CRM system and can lookup equipment, create leads, check schedules, and access customer information. Only if directly asked 'who am I', tell them their name and role in the system."
+                user_context += _CRM_CONTEXT
 
             logger.info(f"Adding personalization context: {user_context}")
             # Add context at the beginning to make sure LLM incorporates it
-            message = f"System note: {user_context}\n\n{message}"
+            message = "".join((_SYSTEM_NOTE_PREFIX, user_context, "\n\n", message))
 
         # Wrap user message into ADK content format
         content = types.Content(role="user", parts=[types.Part(text=message)])
 
-        # Run the agent interaction using get_event_loop
-        loop = asyncio.get_event_loop()
-        response_text = loop.run_until_complete(run_agent(user_id, session_id, content))
+        # Run the agent interaction on the shared agent loop
+        response_text = _run_agent_once(user_id, session_id, message, content)
 
         # Create response with debug information in development
         response_data = {
@@ -140,14 +249,14 @@ def chat_with_agent():
             }
 
         # Build safe JSON response
-        return make_response(json.dumps(response_data), 200, {'Content-Type': 'application/json'})
+        return _json_response(response_data)
 
     except Exception as e:
         logger.exception("Error during chat")
-        return make_response(json.dumps({
+        return _json_response({
             'error': str(e),
             'status': 'error'
-        }), 500, {'Content-Type': 'application/json'})
+        }, 500)
 
 async def run_agent(user_id: str, session_id: str, content: types.Content) -> str:
     """
@@ -161,15 +270,23 @@ async def run_agent(user_id: str, session_id: str, content: types.Content) -> st
     Returns:
         The complete response text from the agent
     """
-    response_parts = []    # Create session explicitly (avoids 'Session not found')
-    session = await session_svc.create_session(
+    response_buffer = io.StringIO()
+    # Reuse the session on follow-up turns; create it explicitly on the first
+    # (avoids 'Session not found')
+    session = await session_svc.get_session(
+        app_name=APP_NAME,
         user_id=user_id,
-        session_id=session_id,
-        app_name=config.app_name
+        session_id=session_id
     )
+    if session is None:
+        session = await session_svc.create_session(
+            user_id=user_id,
+            session_id=session_id,
+            app_name=APP_NAME
+        )
     
     # Add user_id to session state for callbacks to access
-    if hasattr(session, 'state'):
+    if hasattr(session, 'state') and session.state.get('current_user_id') != user_id:
         session.state['current_user_id'] = user_id
 
     logger.info(f"Starting agent run for session {session_id} with user {user_id}")
@@ -183,20 +300,21 @@ async def run_agent(user_id: str, session_id: str, content: types.Content) -> st
             # Log event details to understand structure
             event_type = type(event).__name__
             event_author = getattr(event, 'author', 'unknown')
-            logger.info(f"Event: type={event_type}, author={event_author}")            # Extract text from various event structures
+            logger.debug("Event: type=%s, author=%s", event_type, event_author)            # Extract text from various event structures
             extracted_text = extract_text_from_event(event)
             if extracted_text:
                 # Log in a cleaner format
-                preview = extracted_text[:50].replace('\n', ' ').strip()
-                if len(extracted_text) > 50:
-                    preview += "..."
-                logger.info(f"Response content: {preview}")
-                response_parts.append(extracted_text)
+                if logger.isEnabledFor(logging.DEBUG):
+                    preview = extracted_text[:50].replace('\n', ' ').strip()
+                    if len(extracted_text) > 50:
+                        preview += "..."
+                    logger.debug("Response content: %s", preview)
+                response_buffer.write(extracted_text)
             else:
                 # For debug purposes, cleaner log
-                logger.debug(f"No text in event: {event_type} from {event_author}")
+                logger.debug("No text in event: %s from %s", event_type, event_author)
         
-        final_response = "".join(response_parts)
+        final_response = response_buffer.getvalue()
         
         if not final_response:
             logger.warning("No response was collected from agent events")
@@ -207,7 +325,8 @@ async def run_agent(user_id: str, session_id: str, content: types.Content) -> st
         
         # Log formatted response preview for debugging
         logger.info(f"Final response built (length={len(formatted_response)})")
-        logger.info(f"Response preview: {formatted_response[:100].replace('\n', '\\n')}...")
+        preview = formatted_response[:100].replace('\n', '\\n')
+        logger.info(f"Response preview: {preview}...")
         
         return formatted_response
         
@@ -226,33 +345,43 @@ def extract_text_from_event(event):
         Extracted text or empty string if no text found
     """
     # Case 1: event has content with parts (typical ADK Gemini response)
-    if hasattr(event, 'content') and event.content:
-        if hasattr(event.content, 'parts'):
-            parts_text = []
-            for part in event.content.parts:
-                if hasattr(part, 'text') and part.text:
-                    parts_text.append(part.text)
-            if parts_text:
-                return "".join(parts_text)
-        
-        # Case 2: event content has direct text attribute
-        elif hasattr(event.content, 'text') and event.content.text:
-            return event.content.text
-        
+    content = getattr(event, 'content', None)
+    if content:
+        try:
+            parts = content.parts
+        except AttributeError:
+            # Case 2: event content has direct text attribute
+            return getattr(content, 'text', None) or ""
+        return "".join(part.text for part in parts or () if getattr(part, 'text', None))
+    
     # Case 3: event has direct text attribute
-    elif hasattr(event, 'text') and event.text:
-        return event.text
+    text = getattr(event, 'text', None)
+    if text:
+        return text
     
     # Case 4: event has response attribute with text
-    elif hasattr(event, 'response') and event.response:
-        if hasattr(event.response, 'text'):
-            return event.response.text
-        elif isinstance(event.response, str):
-            return event.response
+    response = getattr(event, 'response', None)
+    if response:
+        if isinstance(response, str):
+            return response
+        return getattr(response, 'text', None) or ""
     
     # No text found
     return ""
 
+# All HTML handled by format_response, in one alternation: bold/strong and
+# italic/em become markdown, <br> becomes a paragraph break, anything else goes
+_HTML_TAGS = re.compile(r'<(b|strong)>(.*?)</\1>|<(i|em)>(.*?)</\3>|(<br\s*/?>)|<[^>]*>')
+_NUMBERED_POINTS = re.compile(r'(\d+\..*?)(\n)(\d+\.)')
+
+def _html_to_markdown(match):
+    """Replacement for one _HTML_TAGS match (tags nested inside are converted too)"""
+    if match.group(2) is not None:
+        return f"**{_HTML_TAGS.sub(_html_to_markdown, match.group(2))}**"
+    if match.group(4) is not None:
+        return f"_{_HTML_TAGS.sub(_html_to_markdown, match.group(4))}_"
+    return '\n\n' if match.group(5) else ''
+
 def format_response(text):
     """
     Format the response text for better readability
@@ -268,17 +397,13 @@ def format_response(text):
     
     # IMPORTANT: Remove any HTML tags that might have been inserted
     # Replace HTML tags with their markdown equivalents or remove them
-    formatted = re.sub(r'<b>(.*?)</b>', r'**\1**', formatted)  # Bold
-    formatted = re.sub(r'<strong>(.*?)</strong>', r'**\1**', formatted)  # Strong
-    formatted = re.sub(r'<i>(.*?)</i>', r'_\1_', formatted)  # Italic
-    formatted = re.sub(r'<em>(.*?)</em>', r'_\1_', formatted)  # Emphasis
-    formatted = re.sub(r'<br\s*/?>', '\n\n', formatted)  # Line breaks to double newlines
-    
-    # Remove any remaining HTML tags
-    formatted = re.sub(r'<[^>]*>', '', formatted)
+    # (most replies are plain markdown, so skip the scan when there is no tag)
+    if '<' in formatted:
+        formatted = _HTML_TAGS.sub(_html_to_markdown, formatted)
     
-    # Ensure double line breaks between numbered points
-    formatted = re.sub(r'(\d+\..*?)(\n)(\d+\.)', r'\1\n\n\3', formatted)
+    # Ensure double line breaks between numbered points (only possible across a newline)
+    if '\n' in formatted:
+        formatted = _NUMBERED_POINTS.sub(r'\1\n\n\3', formatted)
     
     # Ensure specific patterns use markdown formatting
     # DON'T replace existing markdown formatting
@@ -294,30 +419,33 @@ def format_response(text):
 @app.route('/agent/leads', methods=['GET'])
 def get_captured_leads():
     """Endpoint to retrieve captured leads"""
-    return make_response(json.dumps({
+    return _json_response({
         'leads': 'This would list captured leads.',
         'status': 'info'
-    }), 200, {'Content-Type': 'application/json'})
+    })
+
+# Probed constantly by load balancers, so the body is pre-encoded
+_HEALTH_RESPONSE = (b'{"status":"healthy"}', 200, {'Content-Type': 'application/json'})
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return make_response(json.dumps({'status': 'healthy'}), 200, {'Content-Type': 'application/json'})
+    return make_response(*_HEALTH_RESPONSE)
 
 @app.route('/test-echo', methods=['POST'])
 def test_echo():
     """Echo endpoint for testing API connection"""
     try:
-        data = request.json
-        return make_response(json.dumps({
+        data = _request_json()
+        return _json_response({
             'echo': data,
             'received': True
-        }), 200, {'Content-Type': 'application/json'})
+        })
     except Exception as e:
-        return make_response(json.dumps({
+        return _json_response({
             'error': str(e),
             'status': 'error'
-        }), 500, {'Content-Type': 'application/json'})
+        }, 500)
 
 if __name__ == '__main__':
     # Get port from environment or default to 5000
@@ -326,6 +454,6 @@ if __name__ == '__main__':
     
     logger.info(f"Starting API server on port {port}, debug={debug}")
     logger.info(f"Agent model: {root_agent.model}")
-    logger.info(f"App name: {config.app_name}")
+    logger.info(f"App name: {APP_NAME}")
     
     app.run(host='0.0.0.0', port=port, debug=debug)
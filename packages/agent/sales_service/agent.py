@@ -13,13 +13,22 @@
 # limitations under the License.
 """Agent module for the customer service agent."""
 
+import asyncio
+import functools
 import logging
 import warnings
 import os
+from functools import lru_cache
 
 from google.adk import Agent
-from .config import Config
-from .prompts import GLOBAL_INSTRUCTION, INSTRUCTION
+from google.auth import load_credentials_from_file
+try:
+    from google.generativeai import configure as configure_genai
+except ImportError:  # Only needed for the google-generativeai client
+    configure_genai = None
+from .config import get_config, require_service_account
+from .prompts import (GLOBAL_INSTRUCTION, INSTRUCTION, GLOBAL_INSTRUCTION_COMPRESSED,
+                      INSTRUCTION_COMPRESSED, static_instruction)
 from .shared_libraries.callbacks import (rate_limit_callback, before_agent, before_tool, after_tool)
 from .tools.tools import (
     capture_lead_information,
@@ -36,44 +45,66 @@ from .tools.tools import (
 )
 from .integrations.crm_sync import crm_sync
 
-warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+# Only install the pydantic warning filter once, even if this module is re-imported
+_PYDANTIC_MODULE = r".*pydantic.*"
+if not any(f[0] == "ignore" and f[2] is UserWarning
+           and f[3] is not None and f[3].pattern == _PYDANTIC_MODULE
+           for f in warnings.filters):
+    warnings.filterwarnings("ignore", category=UserWarning, module=_PYDANTIC_MODULE)
 
 # Load config
-configs = Config()
+configs = get_config()
 
 # Setup logger
 logger = logging.getLogger(__name__)
 
 # ===================== ADDED BLOCK FOR CREDENTIALS ===================== #
 # Force use of service account credentials and project
-import json
-from google.auth import load_credentials_from_file
-from google.generativeai import configure as configure_genai
+@lru_cache(maxsize=1)
+def _get_creds(path):
+    """Load service account credentials and their project ID (parsed once per path)."""
+    return load_credentials_from_file(
+        path, scopes=["https://www.googleapis.com/auth/cloud-platform"])
 
-creds_path = configs.GOOGLE_APPLICATION_CREDENTIALS or "service-account.json"
+creds_path = require_service_account(
+    configs.GOOGLE_APPLICATION_CREDENTIALS or "service-account.json")
 
-# Load the service account file to get the project ID
-with open(creds_path, 'r') as f:
-    service_account_info = json.load(f)
-    project_id = service_account_info['project_id']
+# The service account file also carries the project ID
+credentials, project_id = _get_creds(creds_path)
 
 # Set the project environment variable to ensure consistency
 os.environ["GOOGLE_CLOUD_PROJECT"] = project_id
 
-credentials, _ = load_credentials_from_file(
-    creds_path, scopes=["https://www.googleapis.com/auth/cloud-platform"])
-configure_genai(credentials=credentials)
+if configure_genai is not None:
+    configure_genai(credentials=credentials)
 logger.info(
     f"Using local service account: {creds_path} for project: {project_id}")
 # ======================================================================= #
 
+def _off_loop(func):
+    """Wrap a blocking tool or callback so the agent awaits it on a worker thread.
+
+    Every chat in a worker shares one event loop (see robust_api_server), so a
+    Firestore or CRM call made directly on it would stall all of them. The
+    wrapper keeps func's name, docstring and signature for the tool schema.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+    return wrapper
+
+if configs.agent_settings.compact_prompts:
+    global_instruction, instruction = GLOBAL_INSTRUCTION_COMPRESSED, INSTRUCTION_COMPRESSED
+else:
+    global_instruction, instruction = GLOBAL_INSTRUCTION, INSTRUCTION
+
 # Create the root agent
 root_agent = Agent(
     model=configs.agent_settings.model,
-    global_instruction=GLOBAL_INSTRUCTION,
-    instruction=INSTRUCTION,
+    global_instruction=static_instruction(global_instruction),
+    instruction=static_instruction(instruction),
     name=configs.agent_settings.name,
-    tools=[
+    tools=[_off_loop(tool) for tool in (
         # Lead generation tools
         capture_lead_information,
         check_equipment_availability,
@@ -88,9 +119,9 @@ root_agent = Agent(
         create_new_lead,
         schedule_job,
         get_customer_info,
-    ],
+    )],
     before_tool_callback=before_tool,
     after_tool_callback=after_tool,
-    before_agent_callback=before_agent,
+    before_agent_callback=_off_loop(before_agent),
     before_model_callback=rate_limit_callback,
 )
\ No newline at end of file
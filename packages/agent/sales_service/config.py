@@ -2,6 +2,7 @@
 
 import os
 import logging
+from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import BaseModel, Field
 
@@ -11,15 +12,13 @@ from google.auth import default as google_auth_default
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-# Load .env
-load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "../.env"))
-
-
 class AgentModel(BaseModel):
     """Agent model settings."""
 
     name: str = Field(default="sales_service_agent")
     model: str = Field(default="gemini-2.0-flash-001")
+    # Send the condensed prompts from prompts.py (about half the tokens per turn)
+    compact_prompts: bool = Field(default=False)
 
 
 class Config(BaseSettings):
@@ -52,16 +51,34 @@ class Config(BaseSettings):
     CRM_WEBHOOK_URL: str = Field(default="")
     CRM_API_KEY: str = Field(default="")
     CRM_LEAD_ENDPOINT: str = Field(default="/api/leads")
+    # Optional CRM route accepting {"leads": [...]}; when empty (the CRM in
+    # packages/crm has none) queued leads are posted one by one to CRM_LEAD_ENDPOINT
+    CRM_LEAD_BATCH_ENDPOINT: str = Field(default="")
     ENABLE_CRM_SYNC: bool = Field(default=True)
 
 
-# Initialize config
-config = Config()
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Build the shared Config, loading .env at most once per process."""
+    load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "../.env"))
+    return Config()
+
 
-# Assert service account exists
-if not os.path.exists(config.GOOGLE_APPLICATION_CREDENTIALS):
-    raise FileNotFoundError(
-        f"Service account not found at {config.GOOGLE_APPLICATION_CREDENTIALS}")
+@lru_cache(maxsize=None)
+def require_service_account(path: str) -> str:
+    """Assert the service account file exists, checking each path only once.
+
+    Called where credentials are actually loaded rather than at import time.
+    """
+    try:
+        os.stat(path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Service account not found at {path}") from None
+    return path
+
+
+# Initialize config
+config = get_config()
 
 # Load Google credentials
 credentials, project_id = google_auth_default()
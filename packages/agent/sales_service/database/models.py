@@ -3,37 +3,66 @@ Database models for ASP Cranes Agent.
 This is a placeholder module for future database integration.
 """
 
+import operator
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass, field, fields
 
 
-@dataclass
+# Model timestamps only need about second resolution, so the wall clock is read
+# at most once per _NOW_REFRESH seconds however many models are built
+_NOW_REFRESH = 0.5
+_now_cache = (datetime.now(), time.monotonic())
+
+
+def _now() -> datetime:
+    """Get the current time, reusing a reading up to _NOW_REFRESH seconds old."""
+    global _now_cache
+    now, read_at = _now_cache
+    tick = time.monotonic()
+    if tick - read_at > _NOW_REFRESH:
+        now = datetime.now()
+        _now_cache = (now, tick)
+    return now
+
+
+def fast_serializable(cls):
+    """Cache a model's field names, and one getter reading them all, on the class."""
+    cls._field_names = tuple(f.name for f in fields(cls))
+    cls._field_getter = operator.attrgetter(*cls._field_names)
+    return cls
+
+
+@fast_serializable
+@dataclass(slots=True)
 class BaseModel:
     """Base model for all database models."""
     id: Optional[str] = None
-    created_at: datetime = field(default_factory=datetime.now)
-    updated_at: datetime = field(default_factory=datetime.now)
+    created_at: datetime = field(default_factory=_now)
+    updated_at: datetime = field(default_factory=_now)
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert model to dictionary."""
-        return {
-            'id': self.id,
-            'created_at': self.created_at,
-            'updated_at': self.updated_at,
-        }
+        """Convert model to dictionary, keyed by field name."""
+        return dict(zip(self._field_names, self._field_getter(self)))
+    
+    @classmethod
+    def field_names(cls) -> Tuple[str, ...]:
+        """Get model field names in declaration order."""
+        return cls._field_names
+    
+    def to_tuple(self) -> Tuple[Any, ...]:
+        """Convert model to a tuple of field values, ordered as field_names()."""
+        return self._field_getter(self)
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'BaseModel':
-        """Create model from dictionary."""
-        return cls(
-            id=data.get('id'),
-            created_at=data.get('created_at', datetime.now()),
-            updated_at=data.get('updated_at', datetime.now()),
-        )
+        """Create model from dictionary; missing fields take their defaults."""
+        return cls(**{name: data[name] for name in cls._field_names if name in data})
 
 
-@dataclass
+@fast_serializable
+@dataclass(slots=True)
 class Customer(BaseModel):
     """Customer model."""
     first_name: str = ""
@@ -44,35 +73,9 @@ class Customer(BaseModel):
     address: Optional[Dict[str, str]] = None
     notes: Optional[str] = None
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert customer to dictionary."""
-        data = super().to_dict()
-        data.update({
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            'email': self.email,
-            'phone': self.phone,
-            'company': self.company,
-            'address': self.address,
-            'notes': self.notes,
-        })
-        return data
-    
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'Customer':
-        """Create customer from dictionary."""
-        customer = super().from_dict(data)
-        customer.first_name = data.get('first_name', '')
-        customer.last_name = data.get('last_name', '')
-        customer.email = data.get('email', '')
-        customer.phone = data.get('phone', '')
-        customer.company = data.get('company')
-        customer.address = data.get('address')
-        customer.notes = data.get('notes')
-        return customer
 
-
-@dataclass
+@fast_serializable
+@dataclass(slots=True)
 class Lead(BaseModel):
     """Lead model."""
     full_name: str = ""
@@ -89,28 +92,9 @@ class Lead(BaseModel):
     status: str = "new"  # new, contacted, qualified, converted, lost
     assigned_to: Optional[str] = None
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert lead to dictionary."""
-        data = super().to_dict()
-        data.update({
-            'full_name': self.full_name,
-            'phone_number': self.phone_number,
-            'email_address': self.email_address,
-            'machinery_type': self.machinery_type,
-            'site_location': self.site_location,
-            'start_date': self.start_date,
-            'rental_days': self.rental_days,
-            'shift_timing': self.shift_timing,
-            'company_name': self.company_name,
-            'designation': self.designation,
-            'additional_notes': self.additional_notes,
-            'status': self.status,
-            'assigned_to': self.assigned_to,
-        })
-        return data
 
-
-@dataclass
+@fast_serializable
+@dataclass(slots=True)
 class Equipment(BaseModel):
     """Equipment model."""
     name: str = ""
@@ -125,31 +109,14 @@ class Equipment(BaseModel):
     location: str = ""
     specifications: Optional[Dict[str, Any]] = None
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert equipment to dictionary."""
-        data = super().to_dict()
-        data.update({
-            'name': self.name,
-            'equipment_type': self.equipment_type,
-            'model': self.model,
-            'capacity': self.capacity,
-            'available': self.available,
-            'hourly_rate': self.hourly_rate,
-            'daily_rate': self.daily_rate,
-            'weekly_rate': self.weekly_rate,
-            'monthly_rate': self.monthly_rate,
-            'location': self.location,
-            'specifications': self.specifications,
-        })
-        return data
 
-
-@dataclass
+@fast_serializable
+@dataclass(slots=True)
 class Rental(BaseModel):
     """Rental model."""
     customer_id: str = ""
     equipment_id: str = ""
-    start_date: datetime = field(default_factory=datetime.now)
+    start_date: datetime = field(default_factory=_now)
     end_date: Optional[datetime] = None
     site_location: str = ""
     status: str = "scheduled"  # scheduled, active, completed, cancelled
@@ -159,20 +126,3 @@ class Rental(BaseModel):
     total_price: float = 0.0
     deposit_paid: float = 0.0
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert rental to dictionary."""
-        data = super().to_dict()
-        data.update({
-            'customer_id': self.customer_id,
-            'equipment_id': self.equipment_id,
-            'start_date': self.start_date,
-            'end_date': self.end_date,
-            'site_location': self.site_location,
-            'status': self.status,
-            'shift_timing': self.shift_timing,
-            'operator_required': self.operator_required,
-            'special_requirements': self.special_requirements,
-            'total_price': self.total_price,
-            'deposit_paid': self.deposit_paid,
-        })
-        return data
@@ -3,24 +3,85 @@ Database repositories for ASP Cranes Agent.
 This is a placeholder module for future database integration.
 """
 
+import logging
 from typing import Dict, List, Optional, Any, Generic, TypeVar
 from .connection import get_db_connection
 from .models import BaseModel, Customer, Lead, Equipment, Rental
 
 T = TypeVar('T', bound=BaseModel)
 
+logger = logging.getLogger(__name__)
+
 
 class Repository(Generic[T]):
     """Generic repository for database operations."""
     
-    def __init__(self, model_class: type[T]):
-        """Initialize repository.
+    __slots__ = ()
+    
+    model_class: type[T]
+    collection_name: str
+    
+    def __init_subclass__(cls, model_class: Optional[type] = None, **kwargs):
+        """Bind a model class and build its collection name and SQL once per class.
         
         Args:
             model_class: Model class to use for this repository
         """
-        self.model_class = model_class
-        self.collection_name = model_class.__name__.lower() + 's'
+        super().__init_subclass__(**kwargs)
+        if model_class is None:
+            return
+        
+        cls.model_class = model_class
+        cls.collection_name = model_class.__name__.lower() + 's'
+        
+        # Build the batched statements once per repository class
+        columns = model_class.field_names()
+        update_columns = [c for c in columns if c != 'id']
+        cls._update_order = tuple(update_columns) + ('id',)
+        cls._insert_sql = (
+            f"INSERT INTO {cls.collection_name} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))})"
+        )
+        cls._update_sql = (
+            f"UPDATE {cls.collection_name} "
+            f"SET {', '.join(f'{c} = %s' for c in update_columns)} WHERE id = %s"
+        )
+        cls._delete_sql = f"DELETE FROM {cls.collection_name} WHERE id = ANY(%s)"
+    
+    def _execute_batch(self, sql: str, params: List[Any], many: bool = True) -> None:
+        """Run a statement in a single transaction.
+        
+        Args:
+            sql: Parameterized SQL statement
+            params: Parameter rows for executemany, or one parameter tuple
+            many: Whether to use executemany (True) or execute (False)
+        """
+        connection = get_db_connection().connection
+        if connection is None:
+            # Placeholder until connection.py opens a real driver connection
+            logger.debug("Executing on %s (not connected): %s", self.collection_name, sql)
+            return
+        
+        with connection:  # Commits on success, rolls back on error
+            with connection.cursor() as cursor:
+                if many:
+                    cursor.executemany(sql, params)
+                else:
+                    cursor.execute(sql, params)
+    
+    def create_many(self, items: List[T]) -> List[T]:
+        """Create several items in one round trip.
+        
+        Args:
+            items: Items to create
+            
+        Returns:
+            List[T]: Created items
+        """
+        if items:
+            logger.debug("Creating %d %s(s)", len(items), self.model_class.__name__)
+            self._execute_batch(self._insert_sql, [item.to_tuple() for item in items])
+        return items
     
     def create(self, item: T) -> T:
         """Create a new item.
@@ -31,10 +92,7 @@ class Repository(Generic[T]):
         Returns:
             T: Created item with ID
         """
-        # Placeholder for actual database operation
-        # e.g., db.collection(self.collection_name).add(item.to_dict())
-        print(f"Creating {self.model_class.__name__}: {item}")
-        return item
+        return self.create_many([item])[0]
     
     def get(self, item_id: str) -> Optional[T]:
         """Get item by ID.
@@ -48,9 +106,24 @@ class Repository(Generic[T]):
         # Placeholder for actual database operation
         # e.g., doc = db.collection(self.collection_name).document(item_id).get()
         # return self.model_class.from_dict(doc.to_dict()) if doc.exists else None
-        print(f"Getting {self.model_class.__name__} with ID: {item_id}")
+        logger.debug("Getting %s with ID: %s", self.model_class.__name__, item_id)
         return None
     
+    def update_many(self, items: List[T]) -> List[T]:
+        """Update several items in one round trip.
+        
+        Args:
+            items: Items to update
+            
+        Returns:
+            List[T]: Updated items
+        """
+        if items:
+            logger.debug("Updating %d %s(s)", len(items), self.model_class.__name__)
+            rows = [tuple(getattr(item, name) for name in self._update_order) for item in items]
+            self._execute_batch(self._update_sql, rows)
+        return items
+    
     def update(self, item: T) -> T:
         """Update an item.
         
@@ -60,10 +133,21 @@ class Repository(Generic[T]):
         Returns:
             T: Updated item
         """
-        # Placeholder for actual database operation
-        # e.g., db.collection(self.collection_name).document(item.id).set(item.to_dict())
-        print(f"Updating {self.model_class.__name__}: {item}")
-        return item
+        return self.update_many([item])[0]
+    
+    def delete_many(self, item_ids: List[str]) -> bool:
+        """Delete several items with a single statement.
+        
+        Args:
+            item_ids: IDs of items to delete
+            
+        Returns:
+            bool: True if deleted, False otherwise
+        """
+        if item_ids:
+            logger.debug("Deleting %d %s(s)", len(item_ids), self.model_class.__name__)
+            self._execute_batch(self._delete_sql, (list(item_ids),), many=False)
+        return True
     
     def delete(self, item_id: str) -> bool:
         """Delete an item.
@@ -74,10 +158,7 @@ class Repository(Generic[T]):
         Returns:
             bool: True if deleted, False otherwise
         """
-        # Placeholder for actual database operation
-        # e.g., db.collection(self.collection_name).document(item_id).delete()
-        print(f"Deleting {self.model_class.__name__} with ID: {item_id}")
-        return True
+        return self.delete_many([item_id])
     
     def list(self, filters: Optional[Dict[str, Any]] = None) -> List[T]:
         """List items with optional filters.
@@ -92,35 +173,35 @@ class Repository(Generic[T]):
         # e.g., query = db.collection(self.collection_name)
         # if filters:
         #     for key, value in filters.items():
-        #         query = query.where(key, '==', value)
+        #         query = query.where(filter=FieldFilter(key, '==', value))
         # return [self.model_class.from_dict(doc.to_dict()) for doc in query.stream()]
-        print(f"Listing {self.model_class.__name__}s with filters: {filters}")
+        logger.debug("Listing %ss with filters: %s", self.model_class.__name__, filters)
         return []
 
 
 # Create repositories for each model
-class CustomerRepository(Repository[Customer]):
+class CustomerRepository(Repository[Customer], model_class=Customer):
     """Repository for Customer model."""
-    pass
+    __slots__ = ()
 
 
-class LeadRepository(Repository[Lead]):
+class LeadRepository(Repository[Lead], model_class=Lead):
     """Repository for Lead model."""
-    pass
+    __slots__ = ()
 
 
-class EquipmentRepository(Repository[Equipment]):
+class EquipmentRepository(Repository[Equipment], model_class=Equipment):
     """Repository for Equipment model."""
-    pass
+    __slots__ = ()
 
 
-class RentalRepository(Repository[Rental]):
+class RentalRepository(Repository[Rental], model_class=Rental):
     """Repository for Rental model."""
-    pass
+    __slots__ = ()
 
 
 # Initialize repositories
-customer_repository = CustomerRepository(Customer)
-lead_repository = LeadRepository(Lead)
-equipment_repository = EquipmentRepository(Equipment)
-rental_repository = RentalRepository(Rental)
+customer_repository = CustomerRepository()
+lead_repository = LeadRepository()
+equipment_repository = EquipmentRepository()
+rental_repository = RentalRepository()
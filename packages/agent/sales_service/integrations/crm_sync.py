@@ -1,163 +1,543 @@
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import os
+import glob
+import uuid
 import logging
 import json
+import atexit
+import threading
+import time
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-from sales_service.config import Config
+from sales_service.config import get_config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 logger = logging.getLogger(__name__)
-config = Config()
+config = get_config()
+
+# Leads are sent to the CRM in batches: a batch goes out once it holds
+# LEAD_BATCH_SIZE leads or LEAD_FLUSH_INTERVAL seconds after its first lead
+LEAD_BATCH_SIZE = 32
+LEAD_FLUSH_INTERVAL = 0.5
+
+# Leads the CRM did not accept are backed up locally and retried every
+# LEAD_RETRY_INTERVAL seconds, at most LEAD_MAX_ATTEMPTS times in all, with at
+# most LEAD_RETRY_MAX of them waiting
+LEAD_RETRY_INTERVAL = 30
+LEAD_MAX_ATTEMPTS = 5
+LEAD_RETRY_MAX = 1000
+
+# Consecutive CRM failures (transport errors or 5xx) that open the circuit
+# breaker, and how long it then stays open
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_OPEN_SECONDS = 30
+
+# Local backup of synced leads: appended as JSON lines to a file per day. The
+# file is unbuffered, so each lead is one complete write() that several worker
+# processes can append to without interleaving, and a crash loses nothing
+# already logged; leads the CRM has not accepted are also fsynced
+LEAD_LOG_DIR = "crm_logs"
+
+# Leads queued for a batch are first journaled, fsynced, to an outbox file per
+# process (in LEAD_LOG_DIR), and marked done there once the CRM takes them or
+# they are given up. Each process holds an flock on its own outbox; outboxes
+# nobody holds were left by a process that died, and are replayed at startup
+LEAD_OUTBOX_PATTERN = "outbox-*.jsonl"
+
+# Failures a CRM call can hit: transport errors, an undecodable response body
+# and a payload that cannot be encoded
+_REQUEST_ERRORS = (requests.RequestException, ValueError, TypeError)
+
+# CRM timestamps don't need sub-100ms precision, so one ISO string is reused
+# for up to ISO_NOW_TTL seconds across payloads
+ISO_NOW_TTL = 0.1
+_iso_now_cache = (0.0, '')
+
+def _iso_now() -> str:
+    """Current local time as an ISO 8601 string, reusing one up to ISO_NOW_TTL seconds old"""
+    global _iso_now_cache
+    read_at, iso = _iso_now_cache
+    tick = time.monotonic()
+    if not iso or tick - read_at >= ISO_NOW_TTL:
+        iso = datetime.now().isoformat()
+        _iso_now_cache = (tick, iso)
+    return iso
+
+def _json_body(payload: Any) -> bytes:
+    """Encode a request body with orjson (the session already sends Content-Type: application/json)"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode()
+
+def _json_loads(body: bytes) -> Any:
+    """Decode a response body with orjson, falling back to json"""
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+def _json_line(value: Any) -> bytes:
+    """Encode a value as one JSON line; dates and other objects become strings"""
+    if orjson is not None:
+        return orjson.dumps(value, default=str) + b"\n"
+    return json.dumps(value, default=str).encode() + b"\n"
+
+def _unsent_leads(outbox) -> List[Dict[str, Any]]:
+    """Leads journaled in an outbox file without a matching done record"""
+    pending = {}
+    for line in outbox:
+        try:
+            record = _json_loads(line)
+        except ValueError:
+            # A line torn by a crash mid-write
+            continue
+        if record.get('done'):
+            pending.pop(record.get('id'), None)
+        else:
+            pending[record.get('id')] = record.get('lead')
+    return [lead for lead in pending.values() if lead]
+
+def _succeeded(response) -> bool:
+    """Whether the CRM accepted a request (any 2xx, e.g. 201 Created or 204 No Content)"""
+    return 200 <= response.status_code < 300
 
 class CRMSync:
     """Handles synchronization with external CRM systems"""
     
+    # (CRM field, agent lead field, default) for each field copied into the CRM payload
+    _LEAD_FIELD_MAP = (
+        ('contact_name', 'customer_name', None),
+        ('company', 'company_name', None),
+        ('email', 'email', None),
+        ('phone', 'phone', None),
+        ('project_type', 'project_type', 'Equipment Rental'),
+        ('timeline', 'timeline', None),
+        ('budget_range', 'budget_range', 'Not specified'),
+        ('location', 'location', None),
+        ('equipment_needed', 'equipment_types', None),
+        ('project_description', 'project_description', None),
+        ('priority', 'priority', 'normal'),
+    )
+    # Fields with the same value on every lead
+    _LEAD_CONSTANTS = {
+        'source': 'ASP_Cranes_AI_Agent',
+        'status': 'new_lead'
+    }
+    
     def __init__(self):
         self.crm_url = config.CRM_WEBHOOK_URL
         self.api_key = config.CRM_API_KEY
         self.enabled = config.ENABLE_CRM_SYNC
+        # One keep-alive session for every CRM call, so connections (and their
+        # TLS handshakes) are reused; idempotent requests are retried with
+        # exponential backoff, including on gateway errors
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32,
+                              max_retries=Retry(total=3, backoff_factor=0.3,
+                                                status_forcelist=(502, 503, 504)))
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._session.headers.update({
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        })
+        self._batch_endpoint = config.CRM_LEAD_BATCH_ENDPOINT or None
+        # Queued leads are (crm_payload, lead_data, failed attempts so far, outbox ID)
+        self._lead_buffer: List[tuple] = []
+        self._retry_leads: List[tuple] = []
+        self._retry_timer: Optional[threading.Timer] = None
+        self._buffer_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._lead_log = None
+        self._lead_log_day: Optional[str] = None
+        self._lead_log_lock = threading.Lock()
+        self._outbox = None
+        self._outbox_pending = set()
+        self._outbox_lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._circuit_open_until = 0.0
+        self._circuit_lock = threading.Lock()
+        if self.enabled:
+            self._replay_outboxes()
     
-    def sync_lead(self, lead_data: Dict[str, Any]) -> bool:
-        """Sync captured lead data to CRM system"""
+    def sync_lead(self, lead_data: Dict[str, Any], flush_immediately: bool = False) -> bool:
+        """
+        Sync captured lead data to CRM system
+        
+        Leads are queued and posted in batches; the result then says the lead
+        was queued, which only happens once it is safely in the outbox, so it
+        is delivered even if this process dies first. flush_immediately (or an
+        outbox that cannot be written) posts the lead on its own and returns
+        whether the CRM accepted it.
+        """
         if not self.enabled:
-            logger.info("CRM sync disabled")
+            logger.debug("CRM sync disabled")
             return True
             
+        crm_payload = self._lead_payload(lead_data)
+        
+        outbox_id = None if flush_immediately else self._journal_lead(lead_data)
+        if outbox_id is None:
+            return self._send_lead(crm_payload, lead_data)
+        
+        with self._buffer_lock:
+            self._lead_buffer.append((crm_payload, lead_data, 0, outbox_id))
+            batch_full = len(self._lead_buffer) >= LEAD_BATCH_SIZE
+            if not batch_full and self._flush_timer is None:
+                self._flush_timer = threading.Timer(LEAD_FLUSH_INTERVAL, self.flush_leads)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        
+        if batch_full:
+            self.flush_leads()
+        return True
+    
+    def flush_leads(self) -> bool:
+        """
+        Send every queued lead to the CRM
+        
+        Leads that fail are backed up locally and retried after
+        LEAD_RETRY_INTERVAL seconds, up to LEAD_MAX_ATTEMPTS times.
+        """
+        with self._buffer_lock:
+            batch, self._lead_buffer = self._lead_buffer, []
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        if not batch:
+            return True
+        
+        if self._circuit_open():
+            failed = batch
+        elif self._batch_endpoint:
+            failed = self._post_lead_batch(batch)
+        else:
+            failed = [item for item in batch if not self._post_lead(item[0], item[1])]
+        
+        # Back up each synced lead locally (failed ones are backed up durably on requeue)
+        failed_ids = {id(item) for item in failed}
+        delivered = [item for item in batch if id(item) not in failed_ids]
+        for item in delivered:
+            if item[2] == 0:
+                self._log_lead_locally(item[1])
+        self._settle_leads(delivered)
+        if failed:
+            self._requeue_leads(failed)
+        return not failed
+    
+    def _post_lead_batch(self, batch: List[tuple]) -> List[tuple]:
+        """Post queued leads to the batch endpoint and return the ones that failed"""
         try:
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            # Transform lead data for your CRM format
-            crm_payload = self._transform_lead_data(lead_data)
-            
-            # Add timestamp and source metadata
-            crm_payload["source_metadata"] = {
-                "system": "ADK_Agent",
-                "timestamp": datetime.now().isoformat(),
-                "version": "1.0"
-            }
+            response = self._session.post(
+                f"{self.crm_url}{self._batch_endpoint}",
+                data=_json_body({"leads": [item[0] for item in batch]}),
+                timeout=30
+            )
+            self._record_outcome(response)
             
-            response = requests.post(
+            if response.status_code == 404:
+                logger.warning(f"CRM has no batch lead endpoint {self._batch_endpoint} - sending leads one at a time")
+                self._batch_endpoint = None
+                return [item for item in batch if not self._post_lead(item[0], item[1])]
+            if _succeeded(response):
+                logger.info(f"Synced {len(batch)} leads to CRM")
+                return []
+            logger.error(f"CRM batch sync of {len(batch)} leads failed: {response.status_code} - {response.content[:512]!r}")
+            return batch
+                
+        except _REQUEST_ERRORS as e:
+            self._record_outcome(None)
+            logger.error(f"Error syncing {len(batch)} leads to CRM: {e}")
+            return batch
+    
+    def _requeue_leads(self, failed: List[tuple]) -> None:
+        """Back up failed leads locally and schedule another attempt for each"""
+        retry, given_up = [], []
+        for crm_payload, lead_data, attempts, outbox_id in failed:
+            if attempts == 0:
+                self._log_lead_locally(lead_data, durable=True)
+            if attempts + 1 < LEAD_MAX_ATTEMPTS:
+                retry.append((crm_payload, lead_data, attempts + 1, outbox_id))
+            else:
+                given_up.append((crm_payload, lead_data, attempts, outbox_id))
+                logger.error(f"Giving up CRM sync of lead {lead_data.get('customer_name')} after {LEAD_MAX_ATTEMPTS} attempts (kept in the local backup)")
+        
+        with self._buffer_lock:
+            self._retry_leads.extend(retry)
+            overflow = len(self._retry_leads) - LEAD_RETRY_MAX
+            if overflow > 0:
+                given_up.extend(self._retry_leads[:overflow])
+                del self._retry_leads[:overflow]
+                logger.error(f"CRM retry queue full, dropped {overflow} oldest leads (kept in the local backup)")
+            if self._retry_leads and self._retry_timer is None:
+                self._retry_timer = threading.Timer(LEAD_RETRY_INTERVAL, self._retry_failed_leads)
+                self._retry_timer.daemon = True
+                self._retry_timer.start()
+        self._settle_leads(given_up)
+    
+    def _retry_failed_leads(self) -> None:
+        """Put leads waiting for a retry back at the front of the queue and send them"""
+        with self._buffer_lock:
+            self._lead_buffer[:0] = self._retry_leads
+            self._retry_leads = []
+            self._retry_timer = None
+        self.flush_leads()
+    
+    # Outbox: the durable record of queued leads until they are settled
+    
+    def _journal_lead(self, lead_data: Dict[str, Any]) -> Optional[str]:
+        """Durably record a queued lead in this process's outbox and return its outbox ID, or None on failure"""
+        outbox_id = uuid.uuid4().hex
+        try:
+            line = _json_line({'id': outbox_id, 'lead': lead_data})
+            with self._outbox_lock:
+                if self._outbox is None:
+                    os.makedirs(LEAD_LOG_DIR, exist_ok=True)
+                    self._outbox = open(f"{LEAD_LOG_DIR}/outbox-{os.getpid()}.jsonl", 'ab', buffering=0)
+                    if fcntl is not None:
+                        fcntl.flock(self._outbox.fileno(), fcntl.LOCK_EX)
+                self._outbox.write(line)
+                os.fsync(self._outbox.fileno())
+                self._outbox_pending.add(outbox_id)
+            return outbox_id
+        except Exception as e:
+            logger.error(f"Failed to journal lead, sending it right away: {e}")
+            return None
+    
+    def _settle_leads(self, items: List[tuple]) -> None:
+        """Mark leads delivered or given up in the outbox, emptying it once none are pending"""
+        if not items:
+            return
+        try:
+            with self._outbox_lock:
+                if self._outbox is None:
+                    return
+                self._outbox.write(b"".join(_json_line({'id': item[3], 'done': True}) for item in items))
+                self._outbox_pending.difference_update(item[3] for item in items)
+                if not self._outbox_pending:
+                    self._outbox.truncate(0)
+        except Exception as e:
+            logger.error(f"Failed to settle leads in the outbox: {e}")
+    
+    def _replay_outboxes(self) -> None:
+        """Queue the leads that processes which have since died left unsent in their outboxes"""
+        if fcntl is None:
+            return
+        leads = []
+        for path in glob.glob(os.path.join(LEAD_LOG_DIR, LEAD_OUTBOX_PATTERN)):
+            try:
+                with open(path, 'rb') as outbox:
+                    try:
+                        fcntl.flock(outbox.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        # Held by a live process
+                        continue
+                    # Another process may have replayed and removed it while we waited
+                    if os.fstat(outbox.fileno()).st_ino != os.stat(path).st_ino:
+                        continue
+                    leads.extend(_unsent_leads(outbox))
+                    os.remove(path)
+            except OSError as e:
+                logger.error(f"Failed to replay CRM outbox {path}: {e}")
+        if leads:
+            logger.warning(f"Replaying {len(leads)} leads left unsent by an earlier process")
+            for lead_data in leads:
+                self.sync_lead(lead_data)
+    
+    def _post_lead(self, crm_payload: Dict[str, Any], lead_data: Dict[str, Any]) -> bool:
+        """Post a single lead to the CRM lead endpoint and return whether it was accepted"""
+        try:
+            response = self._session.post(
                 f"{self.crm_url}{config.CRM_LEAD_ENDPOINT}",
-                json=crm_payload,
-                headers=headers,
+                data=_json_body(crm_payload),
                 timeout=30
             )
+            self._record_outcome(response)
             
-            if response.status_code == 200:
+            if _succeeded(response):
                 logger.info(f"Lead synced successfully: {lead_data.get('customer_name')}")
-                # Log the lead to a local file as backup
-                self._log_lead_locally(lead_data)
                 return True
-            else:
-                logger.error(f"CRM sync failed: {response.status_code} - {response.text}")
-                return False
+            logger.error(f"CRM sync failed: {response.status_code} - {response.content[:512]!r}")
+            return False
                 
-        except Exception as e:
+        except _REQUEST_ERRORS as e:
+            self._record_outcome(None)
             logger.error(f"Error syncing lead to CRM: {e}")
             return False
     
+    def _send_lead(self, crm_payload: Dict[str, Any], lead_data: Dict[str, Any]) -> bool:
+        """Post a single lead right away, backing it up locally whatever the outcome"""
+        sent = not self._circuit_open() and self._post_lead(crm_payload, lead_data)
+        self._log_lead_locally(lead_data, durable=not sent)
+        return sent
+    
     def get_customer(self, customer_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve customer data from CRM"""
         if not self.enabled:
-            logger.info("CRM sync disabled")
+            logger.debug("CRM sync disabled")
+            return None
+        if self._circuit_open():
             return None
             
         try:
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            response = requests.get(
+            response = self._session.get(
                 f"{self.crm_url}/api/customers/{customer_id}",
-                headers=headers,
                 timeout=30
             )
-            
-            if response.status_code == 200:
-                logger.info(f"Customer data retrieved successfully: {customer_id}")
-                return response.json()
-            else:
-                logger.error(f"CRM customer retrieval failed: {response.status_code} - {response.text}")
-                return None
+            self._record_outcome(response)
+            return self._customer_from(response, customer_id)
                 
-        except Exception as e:
+        except _REQUEST_ERRORS as e:
+            self._record_outcome(None)
             logger.error(f"Error retrieving customer from CRM: {e}")
             return None
     
     def update_customer_status(self, customer_id: str, status: str, notes: Optional[str] = None) -> bool:
         """Update customer status in CRM"""
         if not self.enabled:
-            logger.info("CRM sync disabled")
+            logger.debug("CRM sync disabled")
             return True
+        if self._circuit_open():
+            return False
             
         try:
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            payload = {
-                'status': status,
-                'updated_at': datetime.now().isoformat()
-            }
-            
-            if notes:
-                payload['notes'] = notes
-                
-            response = requests.patch(
+            response = self._session.patch(
                 f"{self.crm_url}/api/customers/{customer_id}",
-                json=payload,
-                headers=headers,
+                data=_json_body(self._status_payload(status, notes)),
                 timeout=30
             )
-            
-            if response.status_code == 200:
-                logger.info(f"Customer status updated successfully: {customer_id}")
-                return True
-            else:
-                logger.error(f"CRM status update failed: {response.status_code} - {response.text}")
-                return False
+            self._record_outcome(response)
+            return self._status_updated(response, customer_id)
                 
-        except Exception as e:
+        except _REQUEST_ERRORS as e:
+            self._record_outcome(None)
             logger.error(f"Error updating customer status in CRM: {e}")
             return False
     
+    # Circuit breaker: after CIRCUIT_FAILURE_THRESHOLD consecutive failures CRM
+    # calls fail fast for CIRCUIT_OPEN_SECONDS instead of each waiting out the
+    # request timeout
+    
+    def _circuit_open(self) -> bool:
+        """Whether CRM calls are currently being short-circuited"""
+        if time.monotonic() < self._circuit_open_until:
+            logger.debug("CRM circuit open, skipping call")
+            return True
+        return False
+    
+    def _record_outcome(self, response) -> None:
+        """Update the circuit breaker from a CRM response (None when the request failed)"""
+        failed = response is None or response.status_code >= 500
+        with self._circuit_lock:
+            if not failed:
+                self._consecutive_failures = 0
+                return
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+                self._consecutive_failures = 0
+                self._circuit_open_until = time.monotonic() + CIRCUIT_OPEN_SECONDS
+                logger.warning(f"CRM unreachable, failing fast for {CIRCUIT_OPEN_SECONDS}s")
+    
+    # Request payloads and response handling
+    
+    def _lead_payload(self, lead_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the CRM payload for a lead, with timestamp and source metadata"""
+        # Transform lead data for your CRM format
+        crm_payload = self._transform_lead_data(lead_data)
+        
+        # Add timestamp and source metadata
+        crm_payload["source_metadata"] = {
+            "system": "ADK_Agent",
+            "timestamp": _iso_now(),
+            "version": "1.0"
+        }
+        return crm_payload
+    
+    def _status_payload(self, status: str, notes: Optional[str]) -> Dict[str, Any]:
+        """Build the CRM payload for a customer status update"""
+        payload = {
+            'status': status,
+            'updated_at': _iso_now()
+        }
+        
+        if notes:
+            payload['notes'] = notes
+        return payload
+    
+    def _customer_from(self, response, customer_id: str) -> Optional[Dict[str, Any]]:
+        """Handle the CRM response to a customer lookup"""
+        if _succeeded(response):
+            logger.info(f"Customer data retrieved successfully: {customer_id}")
+            return _json_loads(response.content)
+        else:
+            logger.error(f"CRM customer retrieval failed: {response.status_code} - {response.content[:512]!r}")
+            return None
+    
+    def _status_updated(self, response, customer_id: str) -> bool:
+        """Handle the CRM response to a customer status update"""
+        if _succeeded(response):
+            logger.info(f"Customer status updated successfully: {customer_id}")
+            return True
+        else:
+            logger.error(f"CRM status update failed: {response.status_code} - {response.content[:512]!r}")
+            return False
+    
     def _transform_lead_data(self, lead_data: Dict[str, Any]) -> Dict[str, Any]:
         """Transform agent lead data to CRM format"""
-        return {
-            'contact_name': lead_data.get('customer_name'),
-            'company': lead_data.get('company_name'),
-            'email': lead_data.get('email'),
-            'phone': lead_data.get('phone'),
-            'project_type': lead_data.get('project_type', 'Equipment Rental'),
-            'timeline': lead_data.get('timeline'),
-            'budget_range': lead_data.get('budget_range', 'Not specified'),
-            'location': lead_data.get('location'),
-            'equipment_needed': lead_data.get('equipment_types'),
-            'project_description': lead_data.get('project_description'),
-            'priority': lead_data.get('priority', 'normal'),
-            'source': 'ASP_Cranes_AI_Agent',
-            'status': 'new_lead'
-        }
+        return {crm_key: lead_data.get(lead_key, default)
+                for crm_key, lead_key, default in self._LEAD_FIELD_MAP} | self._LEAD_CONSTANTS
         
-    def _log_lead_locally(self, lead_data: Dict[str, Any]) -> None:
-        """Log lead data locally as backup"""
+    def _log_lead_locally(self, lead_data: Dict[str, Any], durable: bool = False) -> None:
+        """Log lead data locally as backup, one JSON line per lead in a daily file; durable fsyncs it"""
         try:
-            import os
-            log_dir = "crm_logs"
-            os.makedirs(log_dir, exist_ok=True)
+            line = _json_line(lead_data)
+            day = datetime.now().strftime('%Y%m%d')
             
-            filename = f"{log_dir}/lead_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(filename, 'w') as f:
-                json.dump(lead_data, f, indent=2)
-                
-            logger.info(f"Lead logged locally to {filename}")
+            with self._lead_log_lock:
+                if day != self._lead_log_day:
+                    if self._lead_log is not None:
+                        self._lead_log.close()
+                    os.makedirs(LEAD_LOG_DIR, exist_ok=True)
+                    self._lead_log = open(f"{LEAD_LOG_DIR}/leads-{day}.jsonl", 'ab', buffering=0)
+                    self._lead_log_day = day
+                self._lead_log.write(line)
+                if durable:
+                    os.fsync(self._lead_log.fileno())
         except Exception as e:
             logger.error(f"Failed to log lead locally: {e}")
+    
+    def close(self) -> None:
+        """Send any queued leads and close the local lead log and the outbox"""
+        with self._buffer_lock:
+            if self._retry_timer is not None:
+                self._retry_timer.cancel()
+                self._retry_timer = None
+        self.flush_leads()
+        # Leads still waiting for a retry stay in the outbox for the next process
+        with self._outbox_lock:
+            if self._outbox is not None:
+                try:
+                    if not self._outbox_pending:
+                        os.remove(self._outbox.name)
+                except OSError as e:
+                    logger.error(f"Failed to remove the empty CRM outbox: {e}")
+                self._outbox.close()
+                self._outbox = None
+        with self._lead_log_lock:
+            if self._lead_log is not None:
+                self._lead_log.close()
+                self._lead_log = None
+                self._lead_log_day = None
 
 # Global instance
 crm_sync = CRMSync()
+atexit.register(crm_sync.close)
@@ -9,22 +9,112 @@ Date: 2025
 """
 
 import os
+import copy
+import inspect
 import logging
+import threading
+import functools
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 from datetime import datetime
+from .ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Backend selected for get_default_service(), read once at import
+DATABASE_TYPE = os.environ.get('DATABASE_TYPE', 'firebase').lower()
+
+def cached_result(ttl: float = 30, maxsize: int = 1024) -> Callable:
+    """
+    Serve a read method from a per-instance TTL cache keyed by its arguments.
+    
+    Arguments are bound to the method's signature (defaults applied), so the same
+    call made positionally or by keyword shares one entry. Results are cached and
+    returned as deep copies, so callers may mutate what they get back.
+    Empty results (None, [], {}) are not cached so failed lookups are retried.
+    Subclasses that override a decorated DatabaseService method are wrapped
+    the same way automatically.
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            cache = self._result_cache(func.__name__, ttl, maxsize)
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(bound.arguments.values())[1:]
+            value = cache.get(key)
+            if value is not None:
+                return copy.deepcopy(value)
+            value = func(self, *args, **kwargs)
+            if value:
+                cache.set(key, copy.deepcopy(value))
+            return value
+        wrapper._cache_decorator = decorator
+        return wrapper
+    return decorator
+
+
+def invalidates(*keyed: str, clear: tuple = ()) -> Callable:
+    """
+    Drop cached read results after the decorated write method runs.
+    
+    Args:
+        keyed: Cached reads whose entry for the write's first argument is dropped
+        clear: Cached reads that are emptied entirely
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                # Only touch caches that exist, so the read creates its own with its ttl
+                caches = self.__dict__.get('_result_caches', {})
+                # Same key shape as cached_result for a single-argument read
+                key = tuple(signature.bind(self, *args, **kwargs).arguments.values())[1:2]
+                for name in keyed:
+                    if name in caches:
+                        caches[name].pop(key)
+                for name in clear:
+                    if name in caches:
+                        caches[name].clear()
+        wrapper._cache_decorator = decorator
+        return wrapper
+    return decorator
+
+
 class DatabaseService(ABC):
     """Abstract base class for database service implementations"""
     
+    def __init_subclass__(cls, **kwargs):
+        """Re-apply the cache decorators declared here to overriding methods"""
+        super().__init_subclass__(**kwargs)
+        for name, base_method in vars(DatabaseService).items():
+            redecorate = getattr(base_method, '_cache_decorator', None)
+            override = cls.__dict__.get(name)
+            if redecorate and override is not None and not hasattr(override, '_cache_decorator'):
+                setattr(cls, name, redecorate(override))
+    
+    def _result_cache(self, method_name: str, ttl: float = 30, maxsize: int = 1024) -> TTLCache:
+        """Get (creating on first use) the TTL cache backing a read method"""
+        caches = self.__dict__.setdefault('_result_caches', {})
+        cache = caches.get(method_name)
+        if cache is None:
+            cache = caches.setdefault(method_name, TTLCache(ttl, maxsize))
+        return cache
+    
     @abstractmethod
     def initialize(self) -> None:
         """Initialize the database connection"""
         pass
     
     # User Management
+    # Read on every chat turn; update_user drops the entry, so it can live longer
+    @cached_result(ttl=300, maxsize=10_000)
     @abstractmethod
     def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get a user by their ID"""
@@ -35,6 +125,8 @@ class DatabaseService(ABC):
         """Create a new user and return the user ID"""
         pass
     
+    # Users are also looked up by email/name, so drop every cached alias
+    @invalidates(clear=('get_user_by_id',))
     @abstractmethod
     def update_user(self, user_id: str, user_data: Dict[str, Any]) -> bool:
         """Update an existing user"""
@@ -42,9 +134,14 @@ class DatabaseService(ABC):
     
     # Customer Management
     @abstractmethod
+    def get_customers_by_ids(self, customer_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several customers in one query, keyed by ID (missing IDs are omitted)"""
+        pass
+    
+    @cached_result(ttl=60)
     def get_customer_by_id(self, customer_id: str) -> Optional[Dict[str, Any]]:
         """Get a customer by their ID"""
-        pass
+        return self.get_customers_by_ids([customer_id]).get(customer_id)
     
     @abstractmethod
     def get_customers(self, limit: int = 10) -> List[Dict[str, Any]]:
@@ -56,6 +153,7 @@ class DatabaseService(ABC):
         """Create a new customer and return the customer ID"""
         pass
     
+    @invalidates('get_customer_by_id')
     @abstractmethod
     def update_customer(self, customer_id: str, customer_data: Dict[str, Any]) -> bool:
         """Update an existing customer"""
@@ -63,20 +161,41 @@ class DatabaseService(ABC):
     
     # Lead Management
     @abstractmethod
-    def get_leads(self, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get a list of leads"""
+    def get_leads(self, limit: int = 10, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get a page of leads in a stable, backend-defined order
+        
+        Args:
+            limit: Maximum number of leads to return
+            before: ID of the last lead of the previous page; the page continues after it
+        """
         pass
     
     @abstractmethod
+    def get_lead_counts_by_status(self) -> Dict[str, int]:
+        """Count leads per status without fetching them"""
+        pass
+    
+    @abstractmethod
+    def get_leads_by_ids(self, lead_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several leads in one query, keyed by ID (missing IDs are omitted)"""
+        pass
+    
+    @cached_result(ttl=30)
     def get_lead_by_id(self, lead_id: str) -> Optional[Dict[str, Any]]:
         """Get a lead by its ID"""
-        pass
+        return self.get_leads_by_ids([lead_id]).get(lead_id)
     
     @abstractmethod
     def create_lead(self, lead_data: Dict[str, Any]) -> Optional[str]:
         """Create a new lead and return the lead ID"""
         pass
     
+    def create_leads(self, leads: List[Dict[str, Any]]) -> List[str]:
+        """Create several leads and return the IDs of those that were created"""
+        return [lead_id for lead_id in map(self.create_lead, leads) if lead_id]
+    
+    @invalidates('get_lead_by_id')
     @abstractmethod
     def update_lead(self, lead_id: str, lead_data: Dict[str, Any]) -> bool:
         """Update an existing lead"""
@@ -87,22 +206,34 @@ class DatabaseService(ABC):
         """Get all leads for a specific customer"""
         pass
     
+    def get_leads_by_customers(self, customer_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the leads of several customers, grouped by customer ID"""
+        return {customer_id: self.get_leads_by_customer(customer_id) for customer_id in dict.fromkeys(customer_ids)}
+    
     # Equipment Management
+    @cached_result(ttl=15)
     @abstractmethod
     def get_equipment(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get a list of equipment, optionally filtered by status"""
         pass
     
+    @cached_result(ttl=15)
     @abstractmethod
     def get_available_equipment(self) -> List[Dict[str, Any]]:
         """Get a list of available equipment"""
         pass
     
     @abstractmethod
+    def get_equipment_by_ids(self, equipment_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several equipment items in one query, keyed by ID (missing IDs are omitted)"""
+        pass
+    
+    @cached_result(ttl=30)
     def get_equipment_by_id(self, equipment_id: str) -> Optional[Dict[str, Any]]:
         """Get equipment by its ID"""
-        pass
+        return self.get_equipment_by_ids([equipment_id]).get(equipment_id)
     
+    @invalidates('get_equipment_by_id', clear=('get_equipment', 'get_available_equipment'))
     @abstractmethod
     def update_equipment_status(self, equipment_id: str, status: str) -> bool:
         """Update equipment status"""
@@ -115,9 +246,13 @@ class DatabaseService(ABC):
         pass
     
     @abstractmethod
+    def get_jobs_by_ids(self, job_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several jobs in one query, keyed by ID (missing IDs are omitted)"""
+        pass
+    
     def get_job_by_id(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get a job by its ID"""
-        pass
+        return self.get_jobs_by_ids([job_id]).get(job_id)
     
     @abstractmethod
     def schedule_job(self, job_data: Dict[str, Any]) -> Optional[str]:
@@ -139,6 +274,14 @@ class DatabaseService(ABC):
         """Get all jobs for specific equipment"""
         pass
     
+    def get_jobs_by_customers(self, customer_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the jobs of several customers, grouped by customer ID"""
+        return {customer_id: self.get_jobs_by_customer(customer_id) for customer_id in dict.fromkeys(customer_ids)}
+    
+    def get_jobs_by_equipment_ids(self, equipment_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the jobs of several equipment items, grouped by equipment ID"""
+        return {equipment_id: self.get_jobs_by_equipment(equipment_id) for equipment_id in dict.fromkeys(equipment_ids)}
+    
     # Quotation Management
     @abstractmethod
     def get_quotations(self, limit: int = 10) -> List[Dict[str, Any]]:
@@ -146,15 +289,21 @@ class DatabaseService(ABC):
         pass
     
     @abstractmethod
+    def get_quotations_by_ids(self, quotation_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several quotations in one query, keyed by ID (missing IDs are omitted)"""
+        pass
+    
+    @cached_result(ttl=30)
     def get_quotation_by_id(self, quotation_id: str) -> Optional[Dict[str, Any]]:
         """Get a quotation by its ID"""
-        pass
+        return self.get_quotations_by_ids([quotation_id]).get(quotation_id)
     
     @abstractmethod
     def create_quotation(self, quotation_data: Dict[str, Any]) -> Optional[str]:
         """Create a new quotation and return the quotation ID"""
         pass
     
+    @invalidates('get_quotation_by_id')
     @abstractmethod
     def update_quotation(self, quotation_id: str, quotation_data: Dict[str, Any]) -> bool:
         """Update an existing quotation"""
@@ -167,10 +316,23 @@ class DatabaseService(ABC):
         pass
     
     @abstractmethod
-    def get_chat_history(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get chat history for a user"""
+    def get_chat_history(self, user_id: str, limit: int = 50, after: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get chat history for a user, oldest first
+        
+        Args:
+            user_id: User whose messages to return
+            limit: Maximum number of messages to return
+            after: ID of the last message of the previous page; the page continues after it
+        """
         pass
     
+    def get_chat_history_columns(self, user_id: str, limit: int = 50) -> Dict[str, List[Any]]:
+        """Get chat history for a user as one list per field, for large histories"""
+        messages = self.get_chat_history(user_id, limit)
+        fields = dict.fromkeys(field for message in messages for field in message)
+        return {field: [message.get(field) for message in messages] for field in fields}
+    
     @abstractmethod
     def clear_chat_history(self, user_id: str) -> bool:
         """Clear chat history for a user"""
@@ -191,30 +353,52 @@ class DatabaseService(ABC):
 class DatabaseServiceFactory:
     """Factory class to create database service instances"""
     
-    _instance = None
+    _instances: Dict[str, DatabaseService] = {}
+    _lock = threading.Lock()
     
     @classmethod
     def get_service(cls, service_type: str = "firebase") -> DatabaseService:
         """
         Get a database service instance
         
+        Instances are created and initialized once per service type and shared
+        by every subsequent caller.
+        
         Args:
             service_type: Type of database service ('firebase' or 'postgresql')
             
         Returns:
             DatabaseService instance
         """
-        if service_type.lower() == "firebase":
-            from .firebase_database_service import FirebaseDatabaseService
-            return FirebaseDatabaseService()
-        elif service_type.lower() == "postgresql":
-            from .postgresql_database_service import PostgreSQLDatabaseService
-            return PostgreSQLDatabaseService()
-        else:
-            raise ValueError(f"Unsupported database service type: {service_type}")
+        service_type = service_type.lower()
+        service = cls._instances.get(service_type)
+        if service is not None:
+            return service
+        
+        with cls._lock:
+            service = cls._instances.get(service_type)
+            if service is not None:
+                return service
+            
+            if service_type == "firebase":
+                from .firebase_database_service import FirebaseDatabaseService
+                service = FirebaseDatabaseService()
+            elif service_type == "postgresql":
+                from .postgresql_database_service import PostgreSQLDatabaseService
+                service = PostgreSQLDatabaseService()
+            else:
+                raise ValueError(f"Unsupported database service type: {service_type}")
+            
+            try:
+                service.initialize()
+            except Exception as e:
+                # Keep the instance; its methods retry or report the failure per call
+                logger.error(f"Error initializing {service_type} database service: {e}")
+            
+            cls._instances[service_type] = service
+            return service
     
     @classmethod
     def get_default_service(cls) -> DatabaseService:
         """Get the default database service based on environment configuration"""
-        database_type = os.environ.get('DATABASE_TYPE', 'firebase').lower()
-        return cls.get_service(database_type)
+        return cls.get_service(DATABASE_TYPE)
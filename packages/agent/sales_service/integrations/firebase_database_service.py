@@ -11,8 +11,12 @@ Date: 2025
 import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+from google.cloud.firestore_v1.base_query import FieldFilter
 from .database_service import DatabaseService
-from .firebase_service import firebase_service
+from .firebase_service import _TS, _snap, firebase_service, user_search_fields
+
+# Lead statuses used by the CRM (packages/crm/src/types/lead.ts)
+LEAD_STATUSES = ('new', 'in_process', 'qualified', 'unqualified', 'lost', 'converted')
 
 logger = logging.getLogger(__name__)
 
@@ -24,16 +28,38 @@ class FirebaseDatabaseService(DatabaseService):
         self._initialized = False
     
     def initialize(self) -> None:
-        """Initialize the Firebase connection"""
+        """Initialize the Firebase connection
+        
+        Methods don't need to call this; firebase_service creates its client on first use.
+        """
         if not self._initialized:
             self.firebase_service.initialize()
             self._initialized = True
     
+    def _get_documents_by_ids(self, collection_name: str, doc_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch documents from one collection with a single get_all() round trip"""
+        collection = self.firebase_service.db.collection(collection_name)
+        # dict.fromkeys drops duplicate IDs while keeping order
+        refs = [collection.document(doc_id) for doc_id in dict.fromkeys(doc_ids)]
+        return {doc['id']: doc for doc in self.firebase_service.get_documents(refs)}
+    
+    def _group_by_field(self, collection_name: str, field: str, values: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch the documents whose field matches any of values, grouped by that value"""
+        values = list(dict.fromkeys(values))
+        grouped = {value: [] for value in values}
+        collection = self.firebase_service.db.collection(collection_name)
+        # Firestore 'in' filters accept at most 30 values
+        for start in range(0, len(values), 30):
+            query = collection.where(filter=FieldFilter(field, 'in', values[start:start + 30]))
+            for doc in query.stream():
+                data = _snap(doc)
+                grouped[data[field]].append(data)
+        return grouped
+    
     # User Management
     def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get a user by their ID"""
         try:
-            self.initialize()
             return self.firebase_service.get_user_by_id(user_id)
         except Exception as e:
             logger.error(f"Error getting user by ID: {e}")
@@ -42,13 +68,12 @@ class FirebaseDatabaseService(DatabaseService):
     def create_user(self, user_data: Dict[str, Any]) -> Optional[str]:
         """Create a new user and return the user ID"""
         try:
-            self.initialize()
             # Firebase doesn't have a specific create_user method, so we'll implement it
-            from firebase_admin import firestore
-            
             # Add timestamp fields
-            user_data['createdAt'] = firestore.SERVER_TIMESTAMP
-            user_data['updatedAt'] = firestore.SERVER_TIMESTAMP
+            user_data.update(createdAt=_TS, updatedAt=_TS)
+            
+            # Keep the lowercase lookup fields in sync with name/email
+            user_data.update(user_search_fields(user_data))
             
             # Create user document
             user_ref = self.firebase_service.db.collection('users').document()
@@ -63,11 +88,9 @@ class FirebaseDatabaseService(DatabaseService):
     def update_user(self, user_id: str, user_data: Dict[str, Any]) -> bool:
         """Update an existing user"""
         try:
-            self.initialize()
-            from firebase_admin import firestore
-            
             # Add updated timestamp
-            user_data['updatedAt'] = firestore.SERVER_TIMESTAMP
+            user_data['updatedAt'] = _TS
+            user_data.update(user_search_fields(user_data))
             
             # Update user document
             user_ref = self.firebase_service.db.collection('users').document(user_id)
@@ -80,19 +103,17 @@ class FirebaseDatabaseService(DatabaseService):
             return False
     
     # Customer Management
-    def get_customer_by_id(self, customer_id: str) -> Optional[Dict[str, Any]]:
-        """Get a customer by their ID"""
+    def get_customers_by_ids(self, customer_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several customers in one batched read, keyed by ID"""
         try:
-            self.initialize()
-            return self.firebase_service.get_customer_by_id(customer_id)
+            return self._get_documents_by_ids('customers', customer_ids)
         except Exception as e:
-            logger.error(f"Error getting customer by ID: {e}")
-            return None
+            logger.error(f"Error getting customers by IDs: {e}")
+            return {}
     
     def get_customers(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get a list of customers"""
         try:
-            self.initialize()
             return self.firebase_service.get_customers(limit)
         except Exception as e:
             logger.error(f"Error getting customers: {e}")
@@ -101,12 +122,8 @@ class FirebaseDatabaseService(DatabaseService):
     def create_customer(self, customer_data: Dict[str, Any]) -> Optional[str]:
         """Create a new customer and return the customer ID"""
         try:
-            self.initialize()
-            from firebase_admin import firestore
-            
             # Add timestamp fields
-            customer_data['createdAt'] = firestore.SERVER_TIMESTAMP
-            customer_data['updatedAt'] = firestore.SERVER_TIMESTAMP
+            customer_data.update(createdAt=_TS, updatedAt=_TS)
             
             # Create customer document
             customer_ref = self.firebase_service.db.collection('customers').document()
@@ -121,11 +138,8 @@ class FirebaseDatabaseService(DatabaseService):
     def update_customer(self, customer_id: str, customer_data: Dict[str, Any]) -> bool:
         """Update an existing customer"""
         try:
-            self.initialize()
-            from firebase_admin import firestore
-            
             # Add updated timestamp
-            customer_data['updatedAt'] = firestore.SERVER_TIMESTAMP
+            customer_data['updatedAt'] = _TS
             
             # Update customer document
             customer_ref = self.firebase_service.db.collection('customers').document(customer_id)
@@ -138,33 +152,40 @@ class FirebaseDatabaseService(DatabaseService):
             return False
     
     # Lead Management
-    def get_leads(self, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get a list of leads"""
+    def get_leads(self, limit: int = 10, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get a page of leads in document ID order, starting after the lead ID before"""
         try:
-            self.initialize()
-            return self.firebase_service.get_leads(limit)
+            return self.firebase_service.get_leads(limit, before=before)
         except Exception as e:
             logger.error(f"Error getting leads: {e}")
             return []
     
-    def get_lead_by_id(self, lead_id: str) -> Optional[Dict[str, Any]]:
-        """Get a lead by its ID"""
+    def get_lead_counts_by_status(self) -> Dict[str, int]:
+        """Count leads per status with one count aggregation per CRM lead status"""
         try:
-            self.initialize()
-            lead_doc = self.firebase_service.db.collection('leads').document(lead_id).get()
-            if lead_doc.exists:
-                lead_data = lead_doc.to_dict()
-                lead_data['id'] = lead_doc.id
-                return lead_data
-            return None
+            leads = self.firebase_service.db.collection('leads')
+            counts = {}
+            for status in LEAD_STATUSES:
+                query = leads.where(filter=FieldFilter('status', '==', status)).count()
+                count = query.get()[0][0].value
+                if count:
+                    counts[status] = count
+            return counts
         except Exception as e:
-            logger.error(f"Error getting lead by ID: {e}")
-            return None
+            logger.error(f"Error counting leads by status: {e}")
+            return {}
+    
+    def get_leads_by_ids(self, lead_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several leads in one batched read, keyed by ID"""
+        try:
+            return self._get_documents_by_ids('leads', lead_ids)
+        except Exception as e:
+            logger.error(f"Error getting leads by IDs: {e}")
+            return {}
     
     def create_lead(self, lead_data: Dict[str, Any]) -> Optional[str]:
         """Create a new lead and return the lead ID"""
         try:
-            self.initialize()
             return self.firebase_service.create_lead(lead_data)
         except Exception as e:
             logger.error(f"Error creating lead: {e}")
@@ -173,11 +194,8 @@ class FirebaseDatabaseService(DatabaseService):
     def update_lead(self, lead_id: str, lead_data: Dict[str, Any]) -> bool:
         """Update an existing lead"""
         try:
-            self.initialize()
-            from firebase_admin import firestore
-            
             # Add updated timestamp
-            lead_data['updatedAt'] = firestore.SERVER_TIMESTAMP
+            lead_data['updatedAt'] = _TS
             
             # Update lead document
             lead_ref = self.firebase_service.db.collection('leads').document(lead_id)
@@ -192,26 +210,26 @@ class FirebaseDatabaseService(DatabaseService):
     def get_leads_by_customer(self, customer_id: str) -> List[Dict[str, Any]]:
         """Get all leads for a specific customer"""
         try:
-            self.initialize()
-            query = self.firebase_service.db.collection('leads').where('customerId', '==', customer_id)
+            query = self.firebase_service.db.collection('leads').where(filter=FieldFilter('customerId', '==', customer_id))
             docs = query.stream()
             
-            leads = []
-            for doc in docs:
-                lead_data = doc.to_dict()
-                lead_data['id'] = doc.id
-                leads.append(lead_data)
-            
-            return leads
+            return [_snap(doc) for doc in docs]
         except Exception as e:
             logger.error(f"Error getting leads by customer: {e}")
             return []
     
+    def get_leads_by_customers(self, customer_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the leads of several customers, grouped by customer ID"""
+        try:
+            return self._group_by_field('leads', 'customerId', customer_ids)
+        except Exception as e:
+            logger.error(f"Error getting leads by customers: {e}")
+            return {}
+    
     # Equipment Management
     def get_equipment(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get a list of equipment, optionally filtered by status"""
         try:
-            self.initialize()
             return self.firebase_service.get_equipment(status)
         except Exception as e:
             logger.error(f"Error getting equipment: {e}")
@@ -220,37 +238,27 @@ class FirebaseDatabaseService(DatabaseService):
     def get_available_equipment(self) -> List[Dict[str, Any]]:
         """Get a list of available equipment"""
         try:
-            self.initialize()
             return self.firebase_service.get_available_equipment()
         except Exception as e:
             logger.error(f"Error getting available equipment: {e}")
             return []
     
-    def get_equipment_by_id(self, equipment_id: str) -> Optional[Dict[str, Any]]:
-        """Get equipment by its ID"""
+    def get_equipment_by_ids(self, equipment_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several equipment items in one batched read, keyed by ID"""
         try:
-            self.initialize()
-            equipment_doc = self.firebase_service.db.collection('equipment').document(equipment_id).get()
-            if equipment_doc.exists:
-                equipment_data = equipment_doc.to_dict()
-                equipment_data['id'] = equipment_doc.id
-                return equipment_data
-            return None
+            return self._get_documents_by_ids('equipment', equipment_ids)
         except Exception as e:
-            logger.error(f"Error getting equipment by ID: {e}")
-            return None
+            logger.error(f"Error getting equipment items by IDs: {e}")
+            return {}
     
     def update_equipment_status(self, equipment_id: str, status: str) -> bool:
         """Update equipment status"""
         try:
-            self.initialize()
-            from firebase_admin import firestore
-            
             # Update equipment status
             equipment_ref = self.firebase_service.db.collection('equipment').document(equipment_id)
             equipment_ref.update({
                 'status': status,
-                'updatedAt': firestore.SERVER_TIMESTAMP
+                'updatedAt': _TS
             })
             
             logger.info(f"Updated equipment {equipment_id} status to: {status}")
@@ -263,30 +271,22 @@ class FirebaseDatabaseService(DatabaseService):
     def get_jobs(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get a list of jobs"""
         try:
-            self.initialize()
             return self.firebase_service.get_jobs(limit)
         except Exception as e:
             logger.error(f"Error getting jobs: {e}")
             return []
     
-    def get_job_by_id(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """Get a job by its ID"""
+    def get_jobs_by_ids(self, job_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several jobs in one batched read, keyed by ID"""
         try:
-            self.initialize()
-            job_doc = self.firebase_service.db.collection('jobs').document(job_id).get()
-            if job_doc.exists:
-                job_data = job_doc.to_dict()
-                job_data['id'] = job_doc.id
-                return job_data
-            return None
+            return self._get_documents_by_ids('jobs', job_ids)
         except Exception as e:
-            logger.error(f"Error getting job by ID: {e}")
-            return None
+            logger.error(f"Error getting jobs by IDs: {e}")
+            return {}
     
     def schedule_job(self, job_data: Dict[str, Any]) -> Optional[str]:
         """Schedule a new job and return the job ID"""
         try:
-            self.initialize()
             return self.firebase_service.schedule_job(job_data)
         except Exception as e:
             logger.error(f"Error scheduling job: {e}")
@@ -295,11 +295,8 @@ class FirebaseDatabaseService(DatabaseService):
     def update_job(self, job_id: str, job_data: Dict[str, Any]) -> bool:
         """Update an existing job"""
         try:
-            self.initialize()
-            from firebase_admin import firestore
-            
             # Add updated timestamp
-            job_data['updatedAt'] = firestore.SERVER_TIMESTAMP
+            job_data['updatedAt'] = _TS
             
             # Update job document
             job_ref = self.firebase_service.db.collection('jobs').document(job_id)
@@ -314,17 +311,10 @@ class FirebaseDatabaseService(DatabaseService):
     def get_jobs_by_customer(self, customer_id: str) -> List[Dict[str, Any]]:
         """Get all jobs for a specific customer"""
         try:
-            self.initialize()
-            query = self.firebase_service.db.collection('jobs').where('customerId', '==', customer_id)
+            query = self.firebase_service.db.collection('jobs').where(filter=FieldFilter('customerId', '==', customer_id))
             docs = query.stream()
             
-            jobs = []
-            for doc in docs:
-                job_data = doc.to_dict()
-                job_data['id'] = doc.id
-                jobs.append(job_data)
-            
-            return jobs
+            return [_snap(doc) for doc in docs]
         except Exception as e:
             logger.error(f"Error getting jobs by customer: {e}")
             return []
@@ -332,63 +322,53 @@ class FirebaseDatabaseService(DatabaseService):
     def get_jobs_by_equipment(self, equipment_id: str) -> List[Dict[str, Any]]:
         """Get all jobs for specific equipment"""
         try:
-            self.initialize()
-            query = self.firebase_service.db.collection('jobs').where('equipmentId', '==', equipment_id)
+            query = self.firebase_service.db.collection('jobs').where(filter=FieldFilter('equipmentId', '==', equipment_id))
             docs = query.stream()
             
-            jobs = []
-            for doc in docs:
-                job_data = doc.to_dict()
-                job_data['id'] = doc.id
-                jobs.append(job_data)
-            
-            return jobs
+            return [_snap(doc) for doc in docs]
         except Exception as e:
             logger.error(f"Error getting jobs by equipment: {e}")
             return []
     
+    def get_jobs_by_customers(self, customer_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the jobs of several customers, grouped by customer ID"""
+        try:
+            return self._group_by_field('jobs', 'customerId', customer_ids)
+        except Exception as e:
+            logger.error(f"Error getting jobs by customers: {e}")
+            return {}
+    
+    def get_jobs_by_equipment_ids(self, equipment_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the jobs of several equipment items, grouped by equipment ID"""
+        try:
+            return self._group_by_field('jobs', 'equipmentId', equipment_ids)
+        except Exception as e:
+            logger.error(f"Error getting jobs by equipment IDs: {e}")
+            return {}
+    
     # Quotation Management
     def get_quotations(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get a list of quotations"""
         try:
-            self.initialize()
-            quotations = []
             query = self.firebase_service.db.collection('quotations').limit(limit)
-            docs = query.stream()
-            
-            for doc in docs:
-                quotation_data = doc.to_dict()
-                quotation_data['id'] = doc.id
-                quotations.append(quotation_data)
-            
-            return quotations
+            return [_snap(doc) for doc in query.stream()]
         except Exception as e:
             logger.error(f"Error getting quotations: {e}")
             return []
     
-    def get_quotation_by_id(self, quotation_id: str) -> Optional[Dict[str, Any]]:
-        """Get a quotation by its ID"""
+    def get_quotations_by_ids(self, quotation_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several quotations in one batched read, keyed by ID"""
         try:
-            self.initialize()
-            quotation_doc = self.firebase_service.db.collection('quotations').document(quotation_id).get()
-            if quotation_doc.exists:
-                quotation_data = quotation_doc.to_dict()
-                quotation_data['id'] = quotation_doc.id
-                return quotation_data
-            return None
+            return self._get_documents_by_ids('quotations', quotation_ids)
         except Exception as e:
-            logger.error(f"Error getting quotation by ID: {e}")
-            return None
+            logger.error(f"Error getting quotations by IDs: {e}")
+            return {}
     
     def create_quotation(self, quotation_data: Dict[str, Any]) -> Optional[str]:
         """Create a new quotation and return the quotation ID"""
         try:
-            self.initialize()
-            from firebase_admin import firestore
-            
             # Add timestamp fields
-            quotation_data['createdAt'] = firestore.SERVER_TIMESTAMP
-            quotation_data['updatedAt'] = firestore.SERVER_TIMESTAMP
+            quotation_data.update(createdAt=_TS, updatedAt=_TS)
             
             # Create quotation document
             quotation_ref = self.firebase_service.db.collection('quotations').document()
@@ -403,11 +383,8 @@ class FirebaseDatabaseService(DatabaseService):
     def update_quotation(self, quotation_id: str, quotation_data: Dict[str, Any]) -> bool:
         """Update an existing quotation"""
         try:
-            self.initialize()
-            from firebase_admin import firestore
-            
             # Add updated timestamp
-            quotation_data['updatedAt'] = firestore.SERVER_TIMESTAMP
+            quotation_data['updatedAt'] = _TS
             
             # Update quotation document
             quotation_ref = self.firebase_service.db.collection('quotations').document(quotation_id)
@@ -423,12 +400,9 @@ class FirebaseDatabaseService(DatabaseService):
     def save_chat_message(self, user_id: str, message: Dict[str, Any]) -> Optional[str]:
         """Save a chat message and return the message ID"""
         try:
-            self.initialize()
-            from firebase_admin import firestore
-            
             # Add timestamp and user info
             message['userId'] = user_id
-            message['timestamp'] = firestore.SERVER_TIMESTAMP
+            message['timestamp'] = _TS
             
             # Save to chat_history collection
             message_ref = self.firebase_service.db.collection('chat_history').document()
@@ -440,23 +414,22 @@ class FirebaseDatabaseService(DatabaseService):
             logger.error(f"Error saving chat message: {e}")
             return None
     
-    def get_chat_history(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get chat history for a user"""
+    def get_chat_history(self, user_id: str, limit: int = 50, after: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get chat history for a user, oldest first, starting after the message ID after"""
         try:
-            self.initialize()
-            query = (self.firebase_service.db.collection('chat_history')
-                    .where('userId', '==', user_id)
-                    .order_by('timestamp')
-                    .limit(limit))
+            collection = self.firebase_service.db.collection('chat_history')
+            query = (collection
+                    .where(filter=FieldFilter('userId', '==', user_id))
+                    .order_by('timestamp'))
+            if after:
+                cursor = collection.document(after).get()
+                if not cursor.exists:
+                    return []
+                query = query.start_after(cursor)
+            query = query.limit(limit)
             docs = query.stream()
             
-            messages = []
-            for doc in docs:
-                message_data = doc.to_dict()
-                message_data['id'] = doc.id
-                messages.append(message_data)
-            
-            return messages
+            return [_snap(doc) for doc in docs]
         except Exception as e:
             logger.error(f"Error getting chat history: {e}")
             return []
@@ -464,9 +437,8 @@ class FirebaseDatabaseService(DatabaseService):
     def clear_chat_history(self, user_id: str) -> bool:
         """Clear chat history for a user"""
         try:
-            self.initialize()
             # Get all messages for the user
-            query = self.firebase_service.db.collection('chat_history').where('userId', '==', user_id)
+            query = self.firebase_service.db.collection('chat_history').where(filter=FieldFilter('userId', '==', user_id))
             docs = query.stream()
             
             # Delete each message
@@ -483,19 +455,17 @@ class FirebaseDatabaseService(DatabaseService):
     def get_database_stats(self) -> Dict[str, Any]:
         """Get database statistics for debugging"""
         try:
-            self.initialize()
             stats = {
                 'database_type': 'Firebase Firestore',
                 'connected': True,
                 'collections': {}
             }
             
-            # Count documents in each collection
+            # Count documents in each collection with a server-side count aggregation
             collections = ['users', 'customers', 'leads', 'equipment', 'jobs', 'quotations', 'chat_history']
             for collection_name in collections:
                 try:
-                    docs = list(self.firebase_service.db.collection(collection_name).stream())
-                    stats['collections'][collection_name] = len(docs)
+                    stats['collections'][collection_name] = self.firebase_service._count(collection_name)
                 except Exception as e:
                     stats['collections'][collection_name] = f"Error: {str(e)}"
             
@@ -511,7 +481,6 @@ class FirebaseDatabaseService(DatabaseService):
     def health_check(self) -> bool:
         """Check if the database connection is healthy"""
         try:
-            self.initialize()
             # Try a simple read operation
             test_collection = self.firebase_service.db.collection('users').limit(1)
             list(test_collection.stream())
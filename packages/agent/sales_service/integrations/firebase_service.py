@@ -4,119 +4,261 @@ This module provides functions to interact with Firebase Firestore from the Pyth
 """
 
 import os
+import asyncio
 import json
 import logging
+import functools
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 import firebase_admin
 from firebase_admin import credentials, firestore, auth
+from google.cloud import firestore as google_firestore
+from google.cloud.firestore_v1.base_query import FieldFilter
 
 logger = logging.getLogger(__name__)
 
+# Server-side timestamp sentinel, bound once for the write paths
+_TS = firestore.SERVER_TIMESTAMP
+
+def _snap(doc) -> Dict[str, Any]:
+    """Convert a document snapshot to a dict carrying its document ID as 'id'"""
+    data = doc.to_dict()
+    data['id'] = doc.id
+    return data
+
+def user_search_fields(user_data: Dict[str, Any]) -> Dict[str, str]:
+    """Lowercase copies of a user's name/email used for indexed prefix lookups"""
+    fields = {}
+    if 'name' in user_data:
+        fields['nameLower'] = (user_data['name'] or '').lower()
+    if 'email' in user_data:
+        fields['emailLower'] = (user_data['email'] or '').lower()
+    return fields
+
+# Fields the agent shows for available equipment (CRM schema plus the seeded test records)
+AVAILABLE_EQUIPMENT_FIELDS = [
+    'equipmentId', 'name', 'category', 'maxLiftingCapacity', 'baseRates', 'description',
+    'status', 'model', 'type', 'capacity', 'hourlyRate', 'dailyRate', 'location',
+]
+
+# Fallback equipment used when Firestore has none (read-only; copy with _mock_equipment())
+_MOCK_EQUIPMENT = tuple(MappingProxyType(equip) for equip in (
+    {
+        'id': 'mock1',
+        'name': '30-ton Mobile Crane',
+        'model': 'ASP-30T-Mobile',
+        'status': 'available',
+        'type': 'Mobile Crane',
+        'capacity': '30 tons',
+        'hourlyRate': 250,
+        'dailyRate': 2000,
+        'location': 'Central Depot',
+        'description': 'Versatile 30-ton mobile crane suitable for various construction projects'
+    },
+    {
+        'id': 'mock2',
+        'name': '20-ton Crawler Crane',
+        'model': 'ASP-20T-Crawler',
+        'status': 'available',
+        'type': 'Crawler Crane',
+        'capacity': '20 tons',
+        'hourlyRate': 200,
+        'dailyRate': 1600,
+        'location': 'East Depot',
+        'description': 'Reliable 20-ton crawler crane for rough terrain operation'
+    },
+    {
+        'id': 'mock3',
+        'name': '5-ton Boom Truck',
+        'model': 'ASP-5T-Boom',
+        'status': 'available',
+        'type': 'Boom Truck',
+        'capacity': '5 tons',
+        'hourlyRate': 120,
+        'dailyRate': 900,
+        'location': 'North Depot',
+        'description': 'Compact 5-ton boom truck for light lifts and tight sites'
+    },
+))
+
+def _mock_equipment() -> List[Dict[str, Any]]:
+    """Fresh, mutable copies of the fallback equipment records"""
+    return [dict(equip) for equip in _MOCK_EQUIPMENT]
+
+# Test data is only seeded and debug records only written in development (ASP_ENV=dev)
+_IS_DEV = os.environ.get('ASP_ENV', 'prod') == 'dev'
+
+# Number of independent Firestore clients (each with its own gRPC channel) to spread requests over.
+# The Python client only ships a gRPC transport (there is no REST mode like Node's preferRest),
+# so low-traffic deployments trim channel setup and memory with FIRESTORE_POOL_SIZE=1 instead.
+FIRESTORE_POOL_SIZE = max(1, int(os.environ.get('FIRESTORE_POOL_SIZE', '4')))
+
+_db_lock = threading.Lock()
+# Threads that run the blocking client calls behind the async a* wrappers
+_async_executor = ThreadPoolExecutor(max_workers=FIRESTORE_POOL_SIZE * 4, thread_name_prefix='firestore')
+_db_round_robin = itertools.count()
+
+def _initialize_app():
+    """Initialize the default Firebase app from the service account file and return it"""
+    try:
+        return firebase_admin.get_app()
+    except ValueError:
+        pass  # Default app not initialized yet
+    
+    # Check for separate Firebase credentials first
+    firebase_creds = os.environ.get('FIREBASE_CREDENTIALS', 'firebase-service-account.json')
+    service_account_path = Path(__file__).parents[2] / firebase_creds
+    
+    if not service_account_path.exists():
+        # Fall back to the main service account
+        service_account_path = Path(__file__).parents[2] / 'service-account.json'
+        
+        if not service_account_path.exists():
+            # Try an alternate path (root of the project)
+            alternate_path = Path(__file__).parents[3] / 'service-account.json'
+            if alternate_path.exists():
+                service_account_path = alternate_path
+                logger.info(f"Using service account from alternate path: {service_account_path}")
+            else:
+                logger.error(f"Service account file not found at {service_account_path} or {alternate_path}")
+                raise FileNotFoundError(f"Service account file not found at {service_account_path}")
+    
+    # Log the path used        
+    logger.info(f"Initializing Firebase with credentials from: {service_account_path}")
+    
+    # Check if we need to specify a different project for Firebase
+    firebase_project = os.environ.get('FIREBASE_PROJECT')
+    if firebase_project:
+        # Initialize Firebase with specific project ID
+        cred = credentials.Certificate(str(service_account_path))
+        app = firebase_admin.initialize_app(cred, {
+            'projectId': firebase_project
+        })
+        logger.info(f"Firebase initialized for project: {firebase_project}")
+    else:
+        # Initialize Firebase with default project from service account
+        cred = credentials.Certificate(str(service_account_path))
+        app = firebase_admin.initialize_app(cred)
+    
+    logger.info("Firebase initialized successfully")
+    return app
+
+@functools.lru_cache(maxsize=1)
+def _get_db_pool() -> tuple:
+    """Initialize Firebase once per process and return the pool of Firestore clients"""
+    with _db_lock:
+        app = _initialize_app()
+        primary = firestore.client(app)
+        # firestore.client() caches one client per app, so build the extra ones directly
+        extra = [
+            google_firestore.Client(project=primary.project, credentials=app.credential.get_credential())
+            for _ in range(FIRESTORE_POOL_SIZE - 1)
+        ]
+        logger.info(f"Firestore client pool ready with {1 + len(extra)} clients")
+        # The clients (and their channels) live for the whole process; the library opens
+        # each channel with grpc.keepalive_time_ms=30000, so idle connections stay warm
+        return (primary, *extra)
+
+def _get_db():
+    """Return the next Firestore client from the pool, round-robin"""
+    pool = _get_db_pool()
+    return pool[next(_db_round_robin) % len(pool)]
+
 class FirebaseService:
     """Service class for interacting with Firebase from the Python agent"""
     
-    _instance = None    
+    _instance = None
+    
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(FirebaseService, cls).__new__(cls)
-            cls._instance.initialized = False
         return cls._instance
     
-    def initialize(self):
-        """Initialize Firebase with credentials from service account file"""
-        if self.initialized:
-            return
-            
+    @property
+    def db(self):
+        """Next Firestore client from the shared pool, initialized on first use"""
         try:
-            # Check for separate Firebase credentials first
-            firebase_creds = os.environ.get('FIREBASE_CREDENTIALS', 'firebase-service-account.json')
-            service_account_path = Path(__file__).parents[2] / firebase_creds
-            
-            if not service_account_path.exists():
-                # Fall back to the main service account
-                service_account_path = Path(__file__).parents[2] / 'service-account.json'
-                
-                if not service_account_path.exists():
-                    # Try an alternate path (root of the project)
-                    alternate_path = Path(__file__).parents[3] / 'service-account.json'
-                    if alternate_path.exists():
-                        service_account_path = alternate_path
-                        logger.info(f"Using service account from alternate path: {service_account_path}")
-                    else:
-                        logger.error(f"Service account file not found at {service_account_path} or {alternate_path}")
-                        raise FileNotFoundError(f"Service account file not found at {service_account_path}")
-            
-            # Log the path used        
-            logger.info(f"Initializing Firebase with credentials from: {service_account_path}")
-            
-            # Check if we need to specify a different project for Firebase
-            firebase_project = os.environ.get('FIREBASE_PROJECT')
-            if firebase_project:
-                # Initialize Firebase with specific project ID
-                cred = credentials.Certificate(str(service_account_path))
-                firebase_admin.initialize_app(cred, {
-                    'projectId': firebase_project
-                })
-                logger.info(f"Firebase initialized for project: {firebase_project}")
-            else:
-                # Initialize Firebase with default project from service account
-                cred = credentials.Certificate(str(service_account_path))
-                firebase_admin.initialize_app(cred)
-            
-            # Initialize Firestore
-            self.db = firestore.client()
-            self.initialized = True
-            logger.info("Firebase initialized successfully")
-            
-            # Create test data if needed
-            self._create_test_data_if_needed()
-            
-            # Debug what's in the database
-            self.debug_user_and_equipment()
-            
+            return _get_db()
         except Exception as e:
             logger.error(f"Error initializing Firebase: {e}")
             self._create_mock_data_if_needed()
             raise
     
+    @property
+    def initialized(self) -> bool:
+        """Whether the Firestore client has been created"""
+        return _get_db_pool.cache_info().currsize > 0
+    
+    def initialize(self):
+        """Initialize Firebase with credentials from service account file
+        
+        Kept for backwards compatibility; the client pool is created lazily by _get_db_pool().
+        """
+        return self.db
+    
+    def _warm(self):
+        """Create the client pool and issue a cheap read per client so each gRPC channel and auth token are ready"""
+        try:
+            for db in _get_db_pool():
+                db.collection('_warmup').document('_').get()
+            logger.info("Firestore connection warmed up")
+        except Exception as e:
+            logger.warning(f"Firestore warm-up failed: {e}")
+    
+    def get_documents(self, refs: List[Any]) -> List[Dict[str, Any]]:
+        """Fetch several documents in one BatchGetDocuments round trip
+        
+        Missing documents are skipped; each result carries its document ID as 'id'.
+        """
+        if not refs:
+            return []
+        return [_snap(doc) for doc in self.db.get_all(refs) if doc.exists]
+    
     # User related methods
+    def get_many_users(self, user_ids: List[str]) -> List[Dict[str, Any]]:
+        """Get several users by document ID with a single round trip"""
+        users = self.db.collection('users')
+        # dict.fromkeys drops duplicate IDs while keeping order
+        return self.get_documents([users.document(user_id) for user_id in dict.fromkeys(user_ids)])
+    
     def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get a user by their ID from Firestore"""
-        self.initialize()
         try:
-            logger.info(f"Looking up user with ID: {user_id}")
+            logger.info("Looking up user with ID: %s", user_id)
             
             # First try direct document lookup
             user_doc = self.db.collection('users').document(user_id).get()
             if user_doc.exists:
-                user_data = user_doc.to_dict()
-                user_data['id'] = user_id
-                logger.info(f"Found user by direct ID: {user_data.get('name', 'Unknown')}")
+                user_data = _snap(user_doc)
+                logger.info("Found user by direct ID: %s", user_data.get('name', 'Unknown'))
                 return user_data
                 
             # If not found, try looking up by email (for test@aspcranes.com case)
             if '@' in user_id:
                 email = user_id
-                logger.info(f"Looking up user by email: {email}")
-                query = self.db.collection('users').where('email', '==', email).limit(1)
+                logger.info("Looking up user by email: %s", email)
+                query = self.db.collection('users').where(filter=FieldFilter('email', '==', email)).limit(1)
                 results = list(query.stream())
                 if results:
-                    user_data = results[0].to_dict()
-                    user_data['id'] = results[0].id
-                    logger.info(f"Found user by email: {user_data.get('name', 'Unknown')}")
+                    user_data = _snap(results[0])
+                    logger.info("Found user by email: %s", user_data.get('name', 'Unknown'))
                     return user_data
                     
-            # Try a search by any substring match on email or name for testing
-            logger.info(f"Trying approximate match search on name/email for: {user_id}")
-            all_users = list(self.db.collection('users').stream())
-            for user_doc in all_users:
-                user_data = user_doc.to_dict()                # Try to match by substring in name, email or ID
-                if (user_id.lower() in user_data.get('name', '').lower() or
-                    user_id.lower() in user_data.get('email', '').lower() or
-                    user_id.lower() in user_doc.id.lower()):
-                    user_data['id'] = user_doc.id
-                    logger.info(f"Found user by approximate match: {user_data.get('name', 'Unknown')}")
+            # Try a prefix match on the indexed lowercase name/email fields
+            logger.info("Trying prefix match search on name/email for: %s", user_id)
+            prefix = user_id.lower()
+            for field in ('nameLower', 'emailLower'):
+                query = (self.db.collection('users')
+                         .where(filter=FieldFilter(field, '>=', prefix))
+                         .where(filter=FieldFilter(field, '<', prefix + '\uf8ff'))
+                         .limit(1))
+                for user_doc in query.stream():
+                    user_data = _snap(user_doc)
+                    logger.info("Found user by prefix match: %s", user_data.get('name', 'Unknown'))
                     return user_data
             
             # User not found - return None instead of creating fallback
@@ -129,31 +271,37 @@ class FirebaseService:
             return None
             
     # Lead related methods
-    def get_leads(self, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get a list of leads from Firestore"""
-        self.initialize()
+    def iter_leads(self, limit: int = 10, fields: Optional[List[str]] = None,
+                   before: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Stream leads in document ID order, optionally projected to fields and starting after the lead ID before"""
+        # No order_by on createdAt: that would silently skip the leads the CRM writes, which
+        # only carry a timestamp field. The implicit document ID order covers every lead.
+        collection = self.db.collection('leads')
+        query = collection
+        if before:
+            cursor = collection.document(before).get()
+            if not cursor.exists:
+                return
+            query = query.start_after(cursor)
+        query = query.limit(limit)
+        if fields:
+            query = query.select(fields)
+        yield from map(_snap, query.stream())
+    
+    def get_leads(self, limit: int = 10, fields: Optional[List[str]] = None,
+                  before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get a page of leads from Firestore in document ID order"""
         try:
-            leads = []
-            query = self.db.collection('leads').limit(limit)
-            docs = query.stream()
-            
-            for doc in docs:
-                lead_data = doc.to_dict()
-                lead_data['id'] = doc.id
-                leads.append(lead_data)
-                
-            return leads
+            return list(self.iter_leads(limit, fields, before))
         except Exception as e:
             logger.error(f"Error getting leads: {e}")
             return []
             
     def create_lead(self, lead_data: Dict[str, Any]) -> Optional[str]:
         """Create a new lead in Firestore"""
-        self.initialize()
         try:
             # Add timestamp fields
-            lead_data['createdAt'] = firestore.SERVER_TIMESTAMP
-            lead_data['updatedAt'] = firestore.SERVER_TIMESTAMP
+            lead_data.update(createdAt=_TS, updatedAt=_TS)
             
             # Add the lead to Firestore
             lead_ref = self.db.collection('leads').document()
@@ -164,69 +312,34 @@ class FirebaseService:
             logger.error(f"Error creating lead: {e}")
             return None
       # Equipment related methods
-    def get_equipment(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get a list of equipment from Firestore, optionally filtered by status"""
-        self.initialize()
+    def get_equipment(self, status: Optional[str] = None, fields: Optional[List[str]] = None,
+                      limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get a list of equipment from Firestore, optionally filtered by status, projected to fields and capped at limit"""
         try:
-            equipment_list = []
-            
-            # First check if we need to create test data
-            all_equipment = list(self.db.collection('equipment').stream())
-            if len(all_equipment) == 0:
-                logger.info("No equipment found - creating test equipment")
+            # First check if we need to create test data (development only)
+            if _IS_DEV:
                 self._create_test_data_if_needed()
-                
-                # Try again after creating test data
-                if status:
-                    query = self.db.collection('equipment').where('status', '==', status)
-                else:
-                    query = self.db.collection('equipment')
-                    
-                docs = query.stream()
-            else:
-                # We have equipment, proceed normally
-                if status:
-                    query = self.db.collection('equipment').where('status', '==', status)
-                else:
-                    query = self.db.collection('equipment')
-                    
-                docs = query.stream()
+            
+            # The only Firestore round trip in the common case
+            query = self._equipment_query(status, fields)
+            if limit is not None:
+                query = query.limit(limit)
             
             # Process the equipment
-            equipment_count = 0
-            for doc in docs:
-                equipment_data = doc.to_dict()
-                equipment_data['id'] = doc.id
-                equipment_list.append(equipment_data)
-                equipment_count += 1
+            equipment_list = [_snap(doc) for doc in query.stream()]
+            equipment_count = len(equipment_list)
                 
-            logger.info(f"Retrieved {equipment_count} equipment items with status filter: {status or 'all'}")
+            logger.info("Retrieved %s equipment items with status filter: %s", equipment_count, status or 'all')
+            if limit is not None and equipment_count == limit:
+                logger.warning("Equipment query hit its limit of %s items with status filter: %s; results may be truncated",
+                               limit, status or 'all')
+            if equipment_count == 0 and not _IS_DEV:
+                logger.warning(f"No equipment in Firestore with status filter: {status or 'all'} (test data is only seeded with ASP_ENV=dev)")
             
             # If no equipment found despite our efforts, provide mock data
             if len(equipment_list) == 0 and status == 'available':
                 logger.warning("No available equipment found - returning mock available equipment")
-                equipment_list = [
-                    {
-                        'id': 'mock1',
-                        'name': '30-ton Mobile Crane',
-                        'model': 'ASP-30T-Mobile',
-                        'status': 'available',
-                        'type': 'Mobile Crane',
-                        'capacity': '30 tons',
-                        'hourlyRate': 250,
-                        'dailyRate': 2000
-                    },
-                    {
-                        'id': 'mock2',
-                        'name': '20-ton Crawler Crane',
-                        'model': 'ASP-20T-Crawler',
-                        'status': 'available',
-                        'type': 'Crawler Crane',
-                        'capacity': '20 tons',
-                        'hourlyRate': 200,
-                        'dailyRate': 1600
-                    }
-                ]
+                equipment_list = _mock_equipment()
                 
             return equipment_list
         except Exception as e:
@@ -234,72 +347,41 @@ class FirebaseService:
             # Return mock data on error
             if status == 'available':
                 logger.warning("Returning mock equipment due to error")
-                return [
-                    {
-                        'id': 'mock1',
-                        'name': '30-ton Mobile Crane',
-                        'model': 'ASP-30T-Mobile',                        'status': 'available',
-                        'capacity': '30 tons'
-                    }
-                ]
+                return _mock_equipment()
             return []
             
+    def _equipment_query(self, status: Optional[str] = None, fields: Optional[List[str]] = None):
+        """Build the equipment query for an optional status filter and field projection"""
+        if status:
+            query = self.db.collection('equipment').where(filter=FieldFilter('status', '==', status))
+        else:
+            query = self.db.collection('equipment')
+        if fields:
+            query = query.select(fields)
+        return query
+    
     def get_available_equipment(self) -> List[Dict[str, Any]]:
         """Get a list of available equipment from Firestore"""
         try:
             # First try to get real equipment
-            equipment = self.get_equipment(status='available')
+            equipment = self.get_equipment(status='available', fields=AVAILABLE_EQUIPMENT_FIELDS)
             
             # If no real equipment found, create some mock equipment for testing
             if not equipment or len(equipment) == 0:
                 logger.warning("No available equipment found - creating mock equipment")
-                # Create some mock available equipment
-                mock_equipment = [
-                    {
-                        'id': 'mock1',
-                        'name': '30-ton Mobile Crane',
-                        'model': 'ASP-30T-Mobile',
-                        'status': 'available',
-                        'type': 'Mobile Crane',
-                        'capacity': '30 tons',
-                        'hourlyRate': 250,
-                        'dailyRate': 2000,
-                        'location': 'Central Depot'
-                    },
-                    {
-                        'id': 'mock2',
-                        'name': '20-ton Crawler Crane',
-                        'model': 'ASP-20T-Crawler',
-                        'status': 'available',
-                        'type': 'Crawler Crane',
-                        'capacity': '20 tons',
-                        'hourlyRate': 200,
-                        'dailyRate': 1600,
-                        'location': 'East Depot'
-                    },
-                    {
-                        'id': 'mock3',
-                        'name': '5-ton Boom Truck',
-                        'model': 'ASP-5T-Boom',
-                        'status': 'available',
-                        'type': 'Boom Truck',
-                        'capacity': '5 tons',
-                        'hourlyRate': 120,
-                        'dailyRate': 900,
-                        'location': 'North Depot'
-                    }
-                ]
+                mock_equipment = _mock_equipment()
                 
-                # Try to add these to Firestore for next time
-                for equip in mock_equipment:
-                    try:
-                        # Skip the 'id' when adding to Firestore
-                        equip_id = equip.pop('id')
-                        self.db.collection('equipment').document(equip_id).set(equip)
-                        # Put id back for this session
-                        equip['id'] = equip_id
-                    except Exception as add_err:
-                        logger.error(f"Failed to add mock equipment to Firestore: {add_err}")
+                # Try to add these to Firestore for next time (development only)
+                if _IS_DEV:
+                    for equip in mock_equipment:
+                        try:
+                            # Skip the 'id' when adding to Firestore
+                            equip_id = equip.pop('id')
+                            self.db.collection('equipment').document(equip_id).set(equip)
+                            # Put id back for this session
+                            equip['id'] = equip_id
+                        except Exception as add_err:
+                            logger.error(f"Failed to add mock equipment to Firestore: {add_err}")
                 
                 return mock_equipment
             
@@ -326,31 +408,26 @@ class FirebaseService:
             ]
     
     # Job scheduling methods
-    def get_jobs(self, limit: int = 10) -> List[Dict[str, Any]]:
+    def iter_jobs(self, limit: int = 10, fields: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Stream jobs from Firestore one document at a time, optionally projected to fields"""
+        query = self.db.collection('jobs').limit(limit)
+        if fields:
+            query = query.select(fields)
+        yield from map(_snap, query.stream())
+    
+    def get_jobs(self, limit: int = 10, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Get a list of jobs from Firestore"""
-        self.initialize()
         try:
-            jobs = []
-            query = self.db.collection('jobs').limit(limit)
-            docs = query.stream()
-            
-            for doc in docs:
-                job_data = doc.to_dict()
-                job_data['id'] = doc.id
-                jobs.append(job_data)
-                
-            return jobs
+            return list(self.iter_jobs(limit, fields))
         except Exception as e:
             logger.error(f"Error getting jobs: {e}")
             return []
             
     def schedule_job(self, job_data: Dict[str, Any]) -> Optional[str]:
         """Schedule a new job in Firestore"""
-        self.initialize()
         try:
             # Add timestamp fields
-            job_data['createdAt'] = firestore.SERVER_TIMESTAMP
-            job_data['updatedAt'] = firestore.SERVER_TIMESTAMP
+            job_data.update(createdAt=_TS, updatedAt=_TS)
             
             # Add the job to Firestore
             job_ref = self.db.collection('jobs').document()
@@ -364,72 +441,65 @@ class FirebaseService:
     # Customer related methods
     def get_customer_by_id(self, customer_id: str) -> Optional[Dict[str, Any]]:
         """Get a customer by their ID from Firestore"""
-        self.initialize()
         try:
             customer_doc = self.db.collection('customers').document(customer_id).get()
             if customer_doc.exists:
-                customer_data = customer_doc.to_dict()
-                customer_data['id'] = customer_doc.id
-                return customer_data
+                return _snap(customer_doc)
             return None
         except Exception as e:
             logger.error(f"Error getting customer: {e}")
             return None
             
-    def get_customers(self, limit: int = 10) -> List[Dict[str, Any]]:
+    def iter_customers(self, limit: int = 10, fields: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Stream customers from Firestore one document at a time, optionally projected to fields"""
+        query = self.db.collection('customers').limit(limit)
+        if fields:
+            query = query.select(fields)
+        yield from map(_snap, query.stream())
+    
+    def get_customers(self, limit: int = 10, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Get a list of customers from Firestore"""
-        self.initialize()
         try:
-            customers = []
-            query = self.db.collection('customers').limit(limit)
-            docs = query.stream()
-            
-            for doc in docs:
-                customer_data = doc.to_dict()
-                customer_data['id'] = doc.id
-                customers.append(customer_data)
-                
-            return customers
+            return list(self.iter_customers(limit, fields))
         except Exception as e:
             logger.error(f"Error getting customers: {e}")
             return []
     
     def debug_user_and_equipment(self):
         """Debug function to log what's in the database for troubleshooting"""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
         try:
-            if not self.initialized:
-                self.initialize()
-                
-            logger.info("==== DEBUG: FIREBASE DATABASE CONTENTS ====")
+            logger.debug("==== DEBUG: FIREBASE DATABASE CONTENTS ====")
             
             # Check equipment collection
-            equipment_docs = list(self.db.collection('equipment').stream())
-            logger.info(f"Equipment count: {len(equipment_docs)}")
-            for i, doc in enumerate(equipment_docs[:5]):  # Show up to 5 items
+            logger.debug(f"Equipment count: {self._count('equipment')}")
+            for i, doc in enumerate(self.db.collection('equipment').select(['name', 'status']).limit(5).stream()):
                 data = doc.to_dict()
-                logger.info(f"Equipment {i+1}: {data.get('name', 'Unknown')} - Status: {data.get('status', 'Unknown')}")
+                logger.debug(f"Equipment {i+1}: {data.get('name', 'Unknown')} - Status: {data.get('status', 'Unknown')}")
             
             # Check users collection
-            users_docs = list(self.db.collection('users').stream())
-            logger.info(f"Users count: {len(users_docs)}")
-            for i, doc in enumerate(users_docs[:5]):  # Show up to 5 items
+            users_count = self._count('users')
+            logger.debug(f"Users count: {users_count}")
+            for i, doc in enumerate(self.db.collection('users').select(['name']).limit(5).stream()):
                 data = doc.to_dict()
-                logger.info(f"User {i+1}: {doc.id} - Name: {data.get('name', 'Unknown')}")
+                logger.debug(f"User {i+1}: {doc.id} - Name: {data.get('name', 'Unknown')}")
                 
-            # If no users, we'll try to create a test user
-            if len(users_docs) == 0:
-                logger.info("No users found - creating test user")
+            # If no users, we'll try to create a test user (development only)
+            if users_count == 0 and _IS_DEV:
+                logger.debug("No users found - creating test user")
                 test_user_id = "test_user_id"
                 test_user = {
                     "name": "Test User",
                     "email": "test@aspcranes.com",
                     "role": "Customer",
-                    "createdAt": firestore.SERVER_TIMESTAMP
+                    "createdAt": _TS
                 }
+                test_user.update(user_search_fields(test_user))
                 self.db.collection("users").document(test_user_id).set(test_user)
-                logger.info(f"Created test user: {test_user['name']}")
+                logger.debug(f"Created test user: {test_user['name']}")
                 
-            logger.info("==========================================")
+            logger.debug("==========================================")
         except Exception as e:
             logger.error(f"Error in debug_user_and_equipment: {e}")
     
@@ -480,59 +550,58 @@ class FirebaseService:
         """Create test data if real data can't be found"""
         try:
             # Check if we need to create some test equipment
-            equipment_list = self.get_equipment()
-            if not equipment_list:
+            if self._collection_empty('equipment'):
                 # No equipment found - create some test data
                 logger.info("No equipment found - creating test equipment data")
                 
-                # Create test equipment
-                test_equipment = [
-                    {
-                        "name": "30-ton Mobile Crane",
-                        "model": "ASP-30T-Mobile",
-                        "status": "available",
-                        "type": "Mobile Crane",
-                        "capacity": "30 tons",
-                        "hourlyRate": 250,
-                        "dailyRate": 2000,
-                        "description": "Versatile 30-ton mobile crane suitable for various construction projects"
-                    },
-                    {
-                        "name": "50-ton Tower Crane",
-                        "model": "ASP-50T-Tower",
-                        "status": "available", 
-                        "type": "Tower Crane",
-                        "capacity": "50 tons",
-                        "hourlyRate": 350,
-                        "dailyRate": 2800,
-                        "description": "Heavy-duty 50-ton tower crane for high-rise construction"
-                    },
-                    {
-                        "name": "20-ton Crawler Crane",
-                        "model": "ASP-20T-Crawler",
-                        "status": "available",
-                        "type": "Crawler Crane",
-                        "capacity": "20 tons",
-                        "hourlyRate": 200,
-                        "dailyRate": 1600,
-                        "description": "Reliable 20-ton crawler crane for rough terrain operation"
-                    }
-                ]
-                
-                # Add test equipment to database
-                for equip in test_equipment:
-                    equip["createdAt"] = firestore.SERVER_TIMESTAMP
-                    equip["updatedAt"] = firestore.SERVER_TIMESTAMP
+                # Add test equipment to database, batching the writes
+                db = self.db
+                equipment_ref = db.collection("equipment")
+                bulk_writer = db.bulk_writer()
+                for equip in _mock_equipment():
+                    equip_id = equip.pop('id')
+                    equip.update(createdAt=_TS, updatedAt=_TS)
                     
-                    self.db.collection("equipment").add(equip)
+                    bulk_writer.create(equipment_ref.document(equip_id), equip)
+                bulk_writer.close()
                     
-                logger.info(f"Created {len(test_equipment)} test equipment records")
+                logger.info(f"Created {len(_MOCK_EQUIPMENT)} test equipment records")
         except Exception as e:
             logger.error(f"Error creating test data: {e}")
     
+    # Async wrappers - run the blocking calls on worker threads so the event loop stays free
+    async def _run_async(self, func, *args):
+        """Run a blocking FirebaseService call on the Firestore executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_async_executor, functools.partial(func, *args))
+    
+    async def aget_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Async version of get_user_by_id"""
+        return await self._run_async(self.get_user_by_id, user_id)
+    
+    async def aget_customer_by_id(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        """Async version of get_customer_by_id"""
+        return await self._run_async(self.get_customer_by_id, customer_id)
+    
+    async def aget_available_equipment(self) -> List[Dict[str, Any]]:
+        """Async version of get_available_equipment"""
+        return await self._run_async(self.get_available_equipment)
+    
+    def _collection_empty(self, collection_name: str) -> bool:
+        """Check for an empty collection by reading at most one document"""
+        return next(iter(self.db.collection(collection_name).limit(1).stream()), None) is None
+    
+    def _count(self, collection_name: str) -> int:
+        """Count a collection's documents with a server-side aggregation query"""
+        return self.db.collection(collection_name).count().get()[0][0].value
+    
     def _check_mock_mode(self):
         """Check if we should operate in mock mode"""
         return hasattr(self, 'mock_data')
 
 # Create a singleton instance
 firebase_service = FirebaseService()
+
+# Pay the Firestore cold start at boot instead of on the first user request
+if not os.environ.get('FIREBASE_SKIP_WARMUP'):
+    threading.Thread(target=firebase_service._warm, name='firestore-warmup', daemon=True).start()
@@ -1,206 +1,1115 @@
 """
 PostgreSQL implementation of the DatabaseService interface.
 
-This module provides PostgreSQL database access using SQLAlchemy ORM.
-This is a placeholder implementation that will be completed when the PostgreSQL
-database is ready for migration.
+This module provides PostgreSQL database access through an asyncpg connection
+pool. Every operation is implemented as an ``a*`` coroutine (``aget_user_by_id``,
+``acreate_lead``, ...) that runs on the service's private event loop thread, which
+owns the pool. The blocking DatabaseService methods wait on those coroutines;
+async code on another loop can ``await asyncio.wrap_future(service.submit(...))``.
+
+Rows are returned as dicts with camelCase keys, matching the Firestore documents
+the rest of the agent already works with.
 
 Author: ASP Cranes Agent Team
 Date: 2025
 """
 
+import os
+import re
+import json
+import uuid
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+import functools
+import threading
+import time
+from decimal import Decimal
+from datetime import date, datetime, timezone
+from collections import defaultdict
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, List, Any, Optional, Tuple
 from .database_service import DatabaseService
+from .ttl_cache import TTLCache
+
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 logger = logging.getLogger(__name__)
 
+# Connection pool settings
+POOL_MIN_SIZE = 2
+POOL_MAX_SIZE = 16
+STATEMENT_CACHE_SIZE = 1024
+
+# Per-session prefetch depth for bitmap heap scans and other async reads. io_method
+# itself (io_uring on PostgreSQL 18+) is a server setting and belongs in postgresql.conf.
+EFFECTIVE_IO_CONCURRENCY = os.environ.get('PG_EFFECTIVE_IO_CONCURRENCY', '256')
+
+# Chat messages are buffered and written with COPY this often (seconds)
+CHAT_FLUSH_INTERVAL = 0.25
+CHAT_BUFFER_MAX = 10000
+
+# Health is tracked by a background ping; health_check only reads its result
+PING_INTERVAL = 5
+PING_MAX_AGE = 15
+# Table counts and server settings in get_database_stats are re-read at most this often
+STATS_CACHE_TTL = 60
+
+# Rows changed by any process are announced here so every service drops its cached copies
+CACHE_CHANNEL = 'asp_cache_invalidate'
+
+# Cached DatabaseService reads affected by a change to each table: (keyed by row ID, cleared)
+_TABLE_CACHES = {
+    'users': ((), ('get_user_by_id',)),
+    'customers': (('get_customer_by_id',), ()),
+    'leads': (('get_lead_by_id',), ()),
+    'equipment': (('get_equipment_by_id',), ('get_equipment', 'get_available_equipment')),
+    'quotations': (('get_quotation_by_id',), ()),
+}
+_CHAT_COPY_COLUMNS = ('id', 'user_id', 'message_type', 'content', 'metadata', 'timestamp')
+# SQLSTATE classes for a row the database refuses (bad data, constraint violation) as opposed to an outage
+_REJECTED_ROW_CLASSES = ('22', '23')
+
+# Writable columns per table (see the schema notes at the end of this module)
+_TABLE_COLUMNS = {
+    'users': ('name', 'email', 'role'),
+    'customers': ('customer_id', 'name', 'company_name', 'email', 'phone', 'address', 'designation'),
+    'leads': ('customer_id', 'customer_name', 'company_name', 'email', 'phone', 'service_needed',
+              'site_location', 'start_date', 'rental_days', 'shift_timing', 'status', 'notes'),
+    'equipment': ('equipment_id', 'name', 'category', 'model', 'manufacturing_date', 'registration_date',
+                  'max_lifting_capacity', 'unladen_weight', 'base_rates', 'running_cost_per_km',
+                  'running_cost', 'description', 'status'),
+    'jobs': ('lead_id', 'customer_id', 'customer_name', 'equipment_id', 'operator_id', 'status',
+             'start_date', 'end_date', 'location', 'notes'),
+    'quotations': ('lead_id', 'customer_id', 'equipment_items', 'subtotal', 'tax_amount', 'total_amount',
+                   'status', 'valid_until', 'notes'),
+    'chat_history': ('user_id', 'message_type', 'content', 'metadata'),
+}
+
+# Columns stamped with now() on insert; chat_history only records when the message was sent
+_INSERT_TIMESTAMPS = {'chat_history': ('timestamp',)}
+_DEFAULT_INSERT_TIMESTAMPS = ('created_at', 'updated_at')
+
+# DATE columns; asyncpg needs datetime.date values rather than ISO strings
+_DATE_COLUMNS = frozenset({'start_date', 'end_date', 'valid_until', 'manufacturing_date', 'registration_date'})
+
+
+@functools.lru_cache(maxsize=None)
+def _column_name(field: str) -> str:
+    """Convert a camelCase field name to its snake_case column name"""
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', field).lower()
+
+
+@functools.lru_cache(maxsize=None)
+def _field_name(column: str) -> str:
+    """Convert a snake_case column name to its camelCase field name"""
+    head, *rest = column.split('_')
+    return head + ''.join(part.title() for part in rest)
+
+
+def _plain(value: Any) -> Any:
+    """Convert asyncpg column values to the plain types the agent tools expect"""
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _row_to_dict(record) -> Dict[str, Any]:
+    """Convert an asyncpg Record to a camelCase dict"""
+    return {_field_name(column): _plain(value) for column, value in record.items()}
+
+
+def _rows_to_dicts(records) -> List[Dict[str, Any]]:
+    """Convert asyncpg Records sharing one column layout to camelCase dicts"""
+    if not records:
+        return []
+    # Every row of a result has the same columns, so map the names once
+    fields = tuple(map(_field_name, records[0].keys()))
+    return [dict(zip(fields, map(_plain, record.values()))) for record in records]
+
+
+def _rows_to_columns(records) -> Dict[str, List[Any]]:
+    """Convert asyncpg Records to one list of values per camelCase column"""
+    if not records:
+        return {}
+    columns = zip(*(record.values() for record in records))
+    return {_field_name(column): list(map(_plain, values)) for column, values in zip(records[0].keys(), columns)}
+
+
+def _uuid_or_none(value: Optional[str]) -> Optional[uuid.UUID]:
+    """Parse value as a UUID, or None if it is missing or malformed"""
+    parsed = _uuid_list([value]) if value else []
+    return parsed[0] if parsed else None
+
+
+def _uuid_list(ids: List[str]) -> List[uuid.UUID]:
+    """Parse the valid UUIDs out of ids, dropping duplicates and anything malformed"""
+    parsed = []
+    for value in dict.fromkeys(ids):
+        try:
+            parsed.append(uuid.UUID(str(value)))
+        except ValueError:
+            logger.debug("Ignoring non-UUID id: %s", value)
+    return parsed
+
+
+def _row_rejected(error: Exception) -> bool:
+    """Whether a write failed because of the row itself rather than the connection or server"""
+    return str(getattr(error, 'sqlstate', None) or '')[:2] in _REJECTED_ROW_CLASSES
+
+
+def _columns_and_values(table: str, data: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+    """Pick the writable columns for table out of a camelCase or snake_case dict"""
+    allowed = _TABLE_COLUMNS[table]
+    columns, values = [], []
+    for key, value in data.items():
+        column = _column_name(key)
+        if column not in allowed or column in columns:
+            continue
+        if column in _DATE_COLUMNS and isinstance(value, str):
+            value = date.fromisoformat(value[:10]) if value else None
+        columns.append(column)
+        values.append(value)
+    return columns, values
+
+
+# Explicit list so the generated search_tsv column is never shipped to the agent
+_EQUIPMENT_COLUMNS = ', '.join(('id', *_TABLE_COLUMNS['equipment'], 'created_at', 'updated_at'))
+
+# Fixed-shape queries, prepared once on every pooled connection
+_STATEMENTS = {
+    'user_by_id': "SELECT * FROM users WHERE id = $1",
+    'user_by_email': "SELECT * FROM users WHERE lower(email) = lower($1) LIMIT 1",
+    # starts_with matches the input literally, so '%' or '_' in a name search are not wildcards
+    'user_by_name_prefix': "SELECT * FROM users WHERE starts_with(lower(name), lower($1)) ORDER BY name LIMIT 1",
+    'customers': "SELECT * FROM customers ORDER BY created_at DESC LIMIT $1",
+    'leads': "SELECT * FROM leads ORDER BY created_at DESC, id DESC LIMIT $1",
+    # Keyset pages: rows after the cursor row in the same order, served from the btree index
+    'leads_before': "SELECT * FROM leads WHERE (created_at, id) < (SELECT created_at, id FROM leads WHERE id = $1) "
+                    "ORDER BY created_at DESC, id DESC LIMIT $2",
+    'lead_counts_by_status': "SELECT status, count(*) AS count FROM leads GROUP BY status",
+    'leads_by_customers': "SELECT * FROM leads WHERE customer_id = ANY($1::uuid[]) ORDER BY created_at DESC",
+    'equipment': f"SELECT {_EQUIPMENT_COLUMNS} FROM equipment ORDER BY name",
+    'equipment_by_status': f"SELECT {_EQUIPMENT_COLUMNS} FROM equipment WHERE status = $1 ORDER BY name",
+    # Literal status so every plan (including generic ones) can use equipment_available_idx
+    'available_equipment': f"SELECT {_EQUIPMENT_COLUMNS} FROM equipment WHERE status = 'available' ORDER BY name",
+    'jobs': "SELECT * FROM jobs ORDER BY created_at DESC LIMIT $1",
+    'jobs_by_customers': "SELECT * FROM jobs WHERE customer_id = ANY($1::uuid[]) ORDER BY start_date",
+    'jobs_by_equipment_ids': "SELECT * FROM jobs WHERE equipment_id = ANY($1::uuid[]) ORDER BY start_date",
+    'quotations': "SELECT * FROM quotations ORDER BY created_at DESC LIMIT $1",
+    'chat_history': "SELECT * FROM chat_history WHERE user_id = $1 ORDER BY timestamp, id LIMIT $2",
+    'chat_history_after': "SELECT * FROM chat_history WHERE user_id = $1 "
+                          "AND (timestamp, id) > (SELECT timestamp, id FROM chat_history WHERE id = $2) "
+                          "ORDER BY timestamp, id LIMIT $3",
+    'table_counts': "SELECT " + ", ".join(f"(SELECT count(*) FROM {table}) AS {table}" for table in _TABLE_COLUMNS),
+    'ping': "SELECT 1",
+    'equipment_by_ids': f"SELECT {_EQUIPMENT_COLUMNS} FROM equipment WHERE id = ANY($1::uuid[])",
+    **{f"{table}_by_ids": f"SELECT * FROM {table} WHERE id = ANY($1::uuid[])"
+       for table in ('customers', 'leads', 'jobs', 'quotations')},
+}
+
+
+if asyncpg is not None:
+    class _Connection(asyncpg.Connection):
+        """asyncpg connection carrying its prepared statements by name"""
+        prepared: Dict[str, Any]
+
+
+def _json_default(value: Any) -> Any:
+    """Encode the non-JSON values rows carry (Decimal rates, dates, UUIDs)"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, uuid.UUID)):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+# JSONB's binary wire format is a version byte followed by the JSON text
+_JSONB_VERSION = b'\x01'
+
+
+def _encode_jsonb(value: Any) -> bytes:
+    """Encode a value as binary JSONB with orjson"""
+    return _JSONB_VERSION + orjson.dumps(value, default=_json_default)
+
+
+def _decode_jsonb(data: bytes) -> Any:
+    """Decode binary JSONB with orjson"""
+    return orjson.loads(data[1:])
+
+
+async def _init_connection(connection) -> None:
+    """Install the JSONB codec and prepare the fixed queries on every pooled connection"""
+    if orjson is not None:
+        # Binary format hands orjson's bytes straight to the wire (and works with COPY)
+        await connection.set_type_codec('jsonb', encoder=_encode_jsonb, decoder=_decode_jsonb,
+                                        schema='pg_catalog', format='binary')
+    else:
+        await connection.set_type_codec('jsonb', encoder=functools.partial(json.dumps, default=_json_default),
+                                        decoder=json.loads, schema='pg_catalog')
+    connection.prepared = {name: await connection.prepare(sql) for name, sql in _STATEMENTS.items()}
+
+
+class _BatchLoader:
+    """
+    Coalesce per-key loads issued in the same event loop tick into one batch call.
+    
+    batch_fn receives the distinct keys and returns a dict of results by key;
+    keys missing from it resolve to an empty list.
+    """
+    
+    def __init__(self, batch_fn: Callable[[List[str]], Awaitable[Dict[str, Any]]]):
+        self._batch_fn = batch_fn
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+    
+    def load(self, key: str) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        if not self._pending:
+            loop.call_soon(self._dispatch)
+        future = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+        return future
+    
+    def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        asyncio.ensure_future(self._resolve(pending))
+    
+    async def _resolve(self, pending: Dict[str, List[asyncio.Future]]) -> None:
+        try:
+            results = await self._batch_fn(list(pending))
+        except Exception as e:
+            results, error = {}, e
+        else:
+            error = None
+        for key, futures in pending.items():
+            for future in futures:
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(results.get(key, []))
+
+
 class PostgreSQLDatabaseService(DatabaseService):
     """PostgreSQL implementation of the DatabaseService interface"""
     
     def __init__(self):
-        self.connection_string = None
-        self.engine = None
-        self.session = None
+        self.connection_string = os.environ.get('DATABASE_URL')
+        self.pool = None
+        self._listener = None
+        self._init_lock = asyncio.Lock()
+        self._last_ping_ok = None
+        self._ping_task = None
+        self._stats_cache = TTLCache(ttl=STATS_CACHE_TTL, maxsize=1)
         self._initialized = False
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._chat_buffer: List[tuple] = []
+        self._chat_buffer_lock = threading.Lock()
+        self._chat_flush_task = None
+        # Per-ID relationship reads made concurrently are answered by one ANY($1) query
+        self._leads_by_customer = _BatchLoader(functools.partial(self._fetch_grouped, 'leads_by_customers', 'customerId'))
+        self._jobs_by_customer = _BatchLoader(functools.partial(self._fetch_grouped, 'jobs_by_customers', 'customerId'))
+        self._jobs_by_equipment = _BatchLoader(functools.partial(self._fetch_grouped, 'jobs_by_equipment_ids', 'equipmentId'))
+    
+    # Event loop plumbing
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Get (starting on first use) the event loop thread the pool lives on"""
+        if self._loop is None:
+            with self._loop_lock:
+                if self._loop is None:
+                    loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name='postgresql-loop', daemon=True).start()
+                    self._loop = loop
+        return self._loop
+    
+    def submit(self, coro) -> Future:
+        """Schedule a coroutine on the service's event loop thread"""
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+    
+    def _run(self, coro):
+        """Run a coroutine on the service's event loop thread and wait for its result"""
+        return self.submit(coro).result()
+    
+    async def ainitialize(self) -> None:
+        """Create the asyncpg connection pool and subscribe to cache invalidations"""
+        if self.pool is not None:
+            return
+        async with self._init_lock:
+            if self.pool is None:
+                await self._create_pool()
+    
+    async def _create_pool(self) -> None:
+        """Open the pool and the LISTEN connection (callers hold _init_lock)"""
+        if asyncpg is None:
+            raise RuntimeError("asyncpg is not installed - add it to use the PostgreSQL database service")
+        if not self.connection_string:
+            raise RuntimeError("DATABASE_URL is not set")
+        
+        self.pool = await asyncpg.create_pool(
+            self.connection_string,
+            min_size=POOL_MIN_SIZE,
+            max_size=POOL_MAX_SIZE,
+            statement_cache_size=STATEMENT_CACHE_SIZE,
+            init=_init_connection,
+            connection_class=_Connection,
+            server_settings={'effective_io_concurrency': EFFECTIVE_IO_CONCURRENCY},
+        )
+        self._initialized = True
+        
+        # LISTEN needs a dedicated connection that is never returned to the pool
+        try:
+            self._listener = await asyncpg.connect(self.connection_string)
+            await self._listener.add_listener(CACHE_CHANNEL, self._on_cache_notification)
+        except Exception as e:
+            logger.warning("Cache invalidation listener unavailable, relying on TTLs: %s", e)
+        
+        self._last_ping_ok = time.monotonic()
+        self._ping_task = asyncio.get_running_loop().create_task(self._ping_loop())
+        
+        io_method = await self.pool.fetchval("SELECT current_setting('io_method', true)")
+        if io_method != 'io_uring':
+            logger.warning("PostgreSQL io_method is %s, not io_uring", io_method or 'unavailable (server older than 18)')
+        logger.info("PostgreSQL connection pool ready")
+    
+    async def _ping_loop(self) -> None:
+        """Ping the database every PING_INTERVAL seconds and record the last success"""
+        while True:
+            await asyncio.sleep(PING_INTERVAL)
+            try:
+                await self._fetchrow('ping')
+                self._last_ping_ok = time.monotonic()
+            except Exception as e:
+                logger.warning("PostgreSQL ping failed: %s", e)
+    
+    def _ping_fresh(self) -> bool:
+        """Whether the last successful ping is recent enough to call the database healthy"""
+        return self._last_ping_ok is not None and time.monotonic() - self._last_ping_ok < PING_MAX_AGE
+    
+    def _on_cache_notification(self, connection, pid, channel, payload) -> None:
+        """Drop cached reads for a row another service instance (or this one) changed"""
+        try:
+            change = json.loads(payload)
+            self._invalidate_cached(change['table'], change.get('id'))
+        except Exception as e:
+            logger.error("Error handling cache notification %r: %s", payload, e)
+    
+    def _invalidate_cached(self, table: str, row_id: Optional[str]) -> None:
+        """Drop the cached reads that may hold a row of table (every row if row_id is None)"""
+        keyed, cleared = _TABLE_CACHES.get(table, ((), ()))
+        caches = self.__dict__.get('_result_caches', {})
+        for name in keyed:
+            if name in caches:
+                if row_id is None:
+                    caches[name].clear()
+                else:
+                    caches[name].pop((row_id,))
+        for name in cleared:
+            if name in caches:
+                caches[name].clear()
+    
+    async def _notify_change(self, table: str, row_id: Optional[str] = None) -> None:
+        """Announce a write on CACHE_CHANNEL for tables other services cache"""
+        if table in _TABLE_CACHES:
+            await self._execute("SELECT pg_notify($1, $2)", CACHE_CHANNEL, json.dumps({'table': table, 'id': row_id}))
     
     def initialize(self) -> None:
         """Initialize the PostgreSQL connection"""
-        # TODO: Implement PostgreSQL connection setup
-        # This will include:
-        # - Setting up SQLAlchemy engine
-        # - Creating database session
-        # - Running migrations if needed
-        logger.warning("PostgreSQL implementation not yet available - use Firebase instead")
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        self._run(self.ainitialize())
+    
+    # Query helpers
+    async def _fetch(self, statement: str, *args) -> List[Dict[str, Any]]:
+        """Run a prepared statement from _STATEMENTS and return every row"""
+        await self.ainitialize()
+        async with self.pool.acquire() as connection:
+            return _rows_to_dicts(await connection.prepared[statement].fetch(*args))
+    
+    async def _fetchrow(self, statement: str, *args) -> Optional[Dict[str, Any]]:
+        """Run a prepared statement from _STATEMENTS and return its first row"""
+        await self.ainitialize()
+        async with self.pool.acquire() as connection:
+            record = await connection.prepared[statement].fetchrow(*args)
+        return _row_to_dict(record) if record is not None else None
+    
+    async def _execute(self, sql: str, *args) -> str:
+        await self.ainitialize()
+        async with self.pool.acquire() as connection:
+            return await connection.execute(sql, *args)
+    
+    async def _fetch_by_ids(self, table: str, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch several rows of table by primary key in one query, keyed by ID"""
+        parsed = _uuid_list(ids)
+        if not parsed:
+            return {}
+        rows = await self._fetch(f"{table}_by_ids", parsed)
+        return {row['id']: row for row in rows}
+    
+    async def _fetch_grouped(self, statement: str, field: str, ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Run an ANY($1) prepared statement for ids and group the rows by field"""
+        grouped = defaultdict(list)
+        parsed = _uuid_list(ids)
+        if parsed:
+            for row in await self._fetch(statement, parsed):
+                grouped[row[field]].append(row)
+        return grouped
+    
+    async def _insert(self, table: str, data: Dict[str, Any]) -> str:
+        """Insert a row built from data and return its new ID"""
+        columns, values = _columns_and_values(table, data)
+        row_id = uuid.uuid4()
+        placeholders = [f"${i}" for i in range(2, len(values) + 2)]
+        stamps = _INSERT_TIMESTAMPS.get(table, _DEFAULT_INSERT_TIMESTAMPS)
+        sql = (f"INSERT INTO {table} (id, {', '.join(columns + list(stamps))}) "
+               f"VALUES ($1, {', '.join(placeholders + ['now()'] * len(stamps))})")
+        await self._execute(sql, row_id, *values)
+        # New rows only affect cached lists, which are cleared whatever the ID
+        await self._notify_change(table, str(row_id))
+        return str(row_id)
+    
+    async def _copy_insert(self, table: str, rows: List[Dict[str, Any]]) -> List[str]:
+        """Insert many rows with COPY and return their new IDs"""
+        if not rows:
+            return []
+        parsed = [dict(zip(*_columns_and_values(table, row))) for row in rows]
+        columns = [column for column in _TABLE_COLUMNS[table] if any(column in row for row in parsed)]
+        ids = [uuid.uuid4() for _ in parsed]
+        now = datetime.now(timezone.utc)
+        stamps = _INSERT_TIMESTAMPS.get(table, _DEFAULT_INSERT_TIMESTAMPS)
+        records = [
+            (row_id, *(row.get(column) for column in columns), *(now for _ in stamps))
+            for row_id, row in zip(ids, parsed)
+        ]
+        await self.ainitialize()
+        async with self.pool.acquire() as connection:
+            await connection.copy_records_to_table(
+                table, records=records, columns=['id', *columns, *stamps]
+            )
+        await self._notify_change(table)
+        return [str(row_id) for row_id in ids]
+    
+    async def _update(self, table: str, row_id: str, data: Dict[str, Any]) -> bool:
+        """Update the given columns of one row; returns whether a row matched"""
+        columns, values = _columns_and_values(table, data)
+        assignments = [f"{column} = ${i}" for i, column in enumerate(columns, start=2)]
+        assignments.append("updated_at = now()")
+        result = await self._execute(
+            f"UPDATE {table} SET {', '.join(assignments)} WHERE id = $1", uuid.UUID(str(row_id)), *values
+        )
+        updated = result.endswith(" 1")
+        if updated:
+            await self._notify_change(table, str(row_id))
+        return updated
     
     # User Management
+    async def aget_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get a user by ID, falling back to email and then a name prefix match"""
+        try:
+            if _uuid_list([user_id]):
+                user = await self._fetchrow('user_by_id', uuid.UUID(user_id))
+                if user:
+                    return user
+            if '@' in user_id:
+                user = await self._fetchrow('user_by_email', user_id)
+                if user:
+                    return user
+            return await self._fetchrow('user_by_name_prefix', user_id)
+        except Exception as e:
+            logger.error("Error getting user by ID: %s", e)
+            return None
+    
+    async def acreate_user(self, user_data: Dict[str, Any]) -> Optional[str]:
+        """Create a new user and return the user ID"""
+        try:
+            return await self._insert('users', user_data)
+        except Exception as e:
+            logger.error("Error creating user: %s", e)
+            return None
+    
+    async def aupdate_user(self, user_id: str, user_data: Dict[str, Any]) -> bool:
+        """Update an existing user"""
+        try:
+            return await self._update('users', user_id, user_data)
+        except Exception as e:
+            logger.error("Error updating user: %s", e)
+            return False
+    
     def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get a user by their ID"""
-        # TODO: Implement PostgreSQL user lookup
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.aget_user_by_id(user_id))
     
     def create_user(self, user_data: Dict[str, Any]) -> Optional[str]:
         """Create a new user and return the user ID"""
-        # TODO: Implement PostgreSQL user creation
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.acreate_user(user_data))
     
     def update_user(self, user_id: str, user_data: Dict[str, Any]) -> bool:
         """Update an existing user"""
-        # TODO: Implement PostgreSQL user update
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.aupdate_user(user_id, user_data))
     
     # Customer Management
-    def get_customer_by_id(self, customer_id: str) -> Optional[Dict[str, Any]]:
-        """Get a customer by their ID"""
-        # TODO: Implement PostgreSQL customer lookup
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+    async def aget_customers_by_ids(self, customer_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several customers in one query, keyed by ID"""
+        try:
+            return await self._fetch_by_ids('customers', customer_ids)
+        except Exception as e:
+            logger.error("Error getting customers by IDs: %s", e)
+            return {}
+    
+    async def aget_customers(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get a list of customers"""
+        try:
+            return await self._fetch('customers', limit)
+        except Exception as e:
+            logger.error("Error getting customers: %s", e)
+            return []
+    
+    async def acreate_customer(self, customer_data: Dict[str, Any]) -> Optional[str]:
+        """Create a new customer and return the customer ID"""
+        try:
+            return await self._insert('customers', customer_data)
+        except Exception as e:
+            logger.error("Error creating customer: %s", e)
+            return None
+    
+    async def aupdate_customer(self, customer_id: str, customer_data: Dict[str, Any]) -> bool:
+        """Update an existing customer"""
+        try:
+            return await self._update('customers', customer_id, customer_data)
+        except Exception as e:
+            logger.error("Error updating customer: %s", e)
+            return False
+    
+    def get_customers_by_ids(self, customer_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several customers in one query, keyed by ID"""
+        return self._run(self.aget_customers_by_ids(customer_ids))
     
     def get_customers(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get a list of customers"""
-        # TODO: Implement PostgreSQL customer list
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.aget_customers(limit))
     
     def create_customer(self, customer_data: Dict[str, Any]) -> Optional[str]:
         """Create a new customer and return the customer ID"""
-        # TODO: Implement PostgreSQL customer creation
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.acreate_customer(customer_data))
     
     def update_customer(self, customer_id: str, customer_data: Dict[str, Any]) -> bool:
         """Update an existing customer"""
-        # TODO: Implement PostgreSQL customer update
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.aupdate_customer(customer_id, customer_data))
     
     # Lead Management
-    def get_leads(self, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get a list of leads"""
-        # TODO: Implement PostgreSQL lead list
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+    async def aget_leads(self, limit: int = 10, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get a page of leads, newest first, starting after the lead ID before"""
+        try:
+            if before is None:
+                return await self._fetch('leads', limit)
+            if not _uuid_list([before]):
+                return []
+            return await self._fetch('leads_before', uuid.UUID(before), limit)
+        except Exception as e:
+            logger.error("Error getting leads: %s", e)
+            return []
+    
+    async def aget_lead_counts_by_status(self) -> Dict[str, int]:
+        """Count leads per status"""
+        try:
+            return {row['status']: row['count'] for row in await self._fetch('lead_counts_by_status')}
+        except Exception as e:
+            logger.error("Error counting leads by status: %s", e)
+            return {}
+    
+    async def aget_leads_by_ids(self, lead_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several leads in one query, keyed by ID"""
+        try:
+            return await self._fetch_by_ids('leads', lead_ids)
+        except Exception as e:
+            logger.error("Error getting leads by IDs: %s", e)
+            return {}
+    
+    async def acreate_lead(self, lead_data: Dict[str, Any]) -> Optional[str]:
+        """Create a new lead and return the lead ID"""
+        try:
+            return await self._insert('leads', lead_data)
+        except Exception as e:
+            logger.error("Error creating lead: %s", e)
+            return None
+    
+    async def acreate_leads(self, leads: List[Dict[str, Any]]) -> List[str]:
+        """Create several leads with one binary COPY and return their IDs"""
+        try:
+            return await self._copy_insert('leads', leads)
+        except Exception as e:
+            logger.error("Error creating %s leads: %s", len(leads), e)
+            return []
     
-    def get_lead_by_id(self, lead_id: str) -> Optional[Dict[str, Any]]:
-        """Get a lead by its ID"""
-        # TODO: Implement PostgreSQL lead lookup
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+    async def aget_leads_by_customers(self, customer_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the leads of several customers in one query, grouped by customer ID"""
+        try:
+            return dict(await self._fetch_grouped('leads_by_customers', 'customerId', customer_ids))
+        except Exception as e:
+            logger.error("Error getting leads by customers: %s", e)
+            return {}
+    
+    async def aupdate_lead(self, lead_id: str, lead_data: Dict[str, Any]) -> bool:
+        """Update an existing lead"""
+        try:
+            return await self._update('leads', lead_id, lead_data)
+        except Exception as e:
+            logger.error("Error updating lead: %s", e)
+            return False
+    
+    async def aget_leads_by_customer(self, customer_id: str) -> List[Dict[str, Any]]:
+        """Get all leads for a specific customer"""
+        try:
+            if not _uuid_list([customer_id]):
+                return []
+            return await self._leads_by_customer.load(str(uuid.UUID(customer_id)))
+        except Exception as e:
+            logger.error("Error getting leads by customer: %s", e)
+            return []
+    
+    def get_leads(self, limit: int = 10, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get a page of leads, newest first, starting after the lead ID before"""
+        return self._run(self.aget_leads(limit, before))
+    
+    def get_lead_counts_by_status(self) -> Dict[str, int]:
+        """Count leads per status"""
+        return self._run(self.aget_lead_counts_by_status())
+    
+    def get_leads_by_ids(self, lead_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several leads in one query, keyed by ID"""
+        return self._run(self.aget_leads_by_ids(lead_ids))
     
     def create_lead(self, lead_data: Dict[str, Any]) -> Optional[str]:
         """Create a new lead and return the lead ID"""
-        # TODO: Implement PostgreSQL lead creation
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.acreate_lead(lead_data))
+    
+    def create_leads(self, leads: List[Dict[str, Any]]) -> List[str]:
+        """Create several leads with one binary COPY and return their IDs"""
+        return self._run(self.acreate_leads(leads))
     
     def update_lead(self, lead_id: str, lead_data: Dict[str, Any]) -> bool:
         """Update an existing lead"""
-        # TODO: Implement PostgreSQL lead update
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.aupdate_lead(lead_id, lead_data))
     
     def get_leads_by_customer(self, customer_id: str) -> List[Dict[str, Any]]:
         """Get all leads for a specific customer"""
-        # TODO: Implement PostgreSQL lead lookup by customer
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.aget_leads_by_customer(customer_id))
+    
+    def get_leads_by_customers(self, customer_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the leads of several customers, grouped by customer ID"""
+        return self._run(self.aget_leads_by_customers(customer_ids))
     
     # Equipment Management
+    async def aget_equipment(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get a list of equipment, optionally filtered by status"""
+        try:
+            if status == 'available':
+                return await self._fetch('available_equipment')
+            if status:
+                return await self._fetch('equipment_by_status', status)
+            return await self._fetch('equipment')
+        except Exception as e:
+            logger.error("Error getting equipment: %s", e)
+            return []
+    
+    async def aget_available_equipment(self) -> List[Dict[str, Any]]:
+        """Get a list of available equipment"""
+        return await self.aget_equipment('available')
+    
+    async def aget_equipment_by_ids(self, equipment_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several equipment items in one query, keyed by ID"""
+        try:
+            return await self._fetch_by_ids('equipment', equipment_ids)
+        except Exception as e:
+            logger.error("Error getting equipment items by IDs: %s", e)
+            return {}
+    
+    async def aupdate_equipment_status(self, equipment_id: str, status: str) -> bool:
+        """Update equipment status"""
+        try:
+            return await self._update('equipment', equipment_id, {'status': status})
+        except Exception as e:
+            logger.error("Error updating equipment status: %s", e)
+            return False
+    
     def get_equipment(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get a list of equipment, optionally filtered by status"""
-        # TODO: Implement PostgreSQL equipment list
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.aget_equipment(status))
     
     def get_available_equipment(self) -> List[Dict[str, Any]]:
         """Get a list of available equipment"""
-        # TODO: Implement PostgreSQL available equipment list
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.aget_available_equipment())
     
-    def get_equipment_by_id(self, equipment_id: str) -> Optional[Dict[str, Any]]:
-        """Get equipment by its ID"""
-        # TODO: Implement PostgreSQL equipment lookup
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+    def get_equipment_by_ids(self, equipment_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several equipment items in one query, keyed by ID"""
+        return self._run(self.aget_equipment_by_ids(equipment_ids))
     
     def update_equipment_status(self, equipment_id: str, status: str) -> bool:
         """Update equipment status"""
-        # TODO: Implement PostgreSQL equipment status update
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.aupdate_equipment_status(equipment_id, status))
     
     # Job Management
+    async def aget_jobs(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get a list of jobs"""
+        try:
+            return await self._fetch('jobs', limit)
+        except Exception as e:
+            logger.error("Error getting jobs: %s", e)
+            return []
+    
+    async def aget_jobs_by_ids(self, job_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several jobs in one query, keyed by ID"""
+        try:
+            return await self._fetch_by_ids('jobs', job_ids)
+        except Exception as e:
+            logger.error("Error getting jobs by IDs: %s", e)
+            return {}
+    
+    async def aschedule_job(self, job_data: Dict[str, Any]) -> Optional[str]:
+        """Schedule a new job and return the job ID"""
+        try:
+            return await self._insert('jobs', job_data)
+        except Exception as e:
+            logger.error("Error scheduling job: %s", e)
+            return None
+    
+    async def aupdate_job(self, job_id: str, job_data: Dict[str, Any]) -> bool:
+        """Update an existing job"""
+        try:
+            return await self._update('jobs', job_id, job_data)
+        except Exception as e:
+            logger.error("Error updating job: %s", e)
+            return False
+    
+    async def aget_jobs_by_customer(self, customer_id: str) -> List[Dict[str, Any]]:
+        """Get all jobs for a specific customer"""
+        try:
+            if not _uuid_list([customer_id]):
+                return []
+            return await self._jobs_by_customer.load(str(uuid.UUID(customer_id)))
+        except Exception as e:
+            logger.error("Error getting jobs by customer: %s", e)
+            return []
+    
+    async def aget_jobs_by_equipment(self, equipment_id: str) -> List[Dict[str, Any]]:
+        """Get all jobs for specific equipment"""
+        try:
+            if not _uuid_list([equipment_id]):
+                return []
+            return await self._jobs_by_equipment.load(str(uuid.UUID(equipment_id)))
+        except Exception as e:
+            logger.error("Error getting jobs by equipment: %s", e)
+            return []
+    
+    async def aget_jobs_by_customers(self, customer_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the jobs of several customers in one query, grouped by customer ID"""
+        try:
+            return dict(await self._fetch_grouped('jobs_by_customers', 'customerId', customer_ids))
+        except Exception as e:
+            logger.error("Error getting jobs by customers: %s", e)
+            return {}
+    
+    async def aget_jobs_by_equipment_ids(self, equipment_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the jobs of several equipment items in one query, grouped by equipment ID"""
+        try:
+            return dict(await self._fetch_grouped('jobs_by_equipment_ids', 'equipmentId', equipment_ids))
+        except Exception as e:
+            logger.error("Error getting jobs by equipment IDs: %s", e)
+            return {}
+    
     def get_jobs(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get a list of jobs"""
-        # TODO: Implement PostgreSQL job list
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.aget_jobs(limit))
     
-    def get_job_by_id(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """Get a job by its ID"""
-        # TODO: Implement PostgreSQL job lookup
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+    def get_jobs_by_ids(self, job_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several jobs in one query, keyed by ID"""
+        return self._run(self.aget_jobs_by_ids(job_ids))
     
     def schedule_job(self, job_data: Dict[str, Any]) -> Optional[str]:
         """Schedule a new job and return the job ID"""
-        # TODO: Implement PostgreSQL job scheduling
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.aschedule_job(job_data))
     
     def update_job(self, job_id: str, job_data: Dict[str, Any]) -> bool:
         """Update an existing job"""
-        # TODO: Implement PostgreSQL job update
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.aupdate_job(job_id, job_data))
     
     def get_jobs_by_customer(self, customer_id: str) -> List[Dict[str, Any]]:
         """Get all jobs for a specific customer"""
-        # TODO: Implement PostgreSQL job lookup by customer
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.aget_jobs_by_customer(customer_id))
     
     def get_jobs_by_equipment(self, equipment_id: str) -> List[Dict[str, Any]]:
         """Get all jobs for specific equipment"""
-        # TODO: Implement PostgreSQL job lookup by equipment
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.aget_jobs_by_equipment(equipment_id))
+    
+    def get_jobs_by_customers(self, customer_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the jobs of several customers, grouped by customer ID"""
+        return self._run(self.aget_jobs_by_customers(customer_ids))
+    
+    def get_jobs_by_equipment_ids(self, equipment_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the jobs of several equipment items, grouped by equipment ID"""
+        return self._run(self.aget_jobs_by_equipment_ids(equipment_ids))
     
     # Quotation Management
+    async def aget_quotations(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get a list of quotations"""
+        try:
+            return await self._fetch('quotations', limit)
+        except Exception as e:
+            logger.error("Error getting quotations: %s", e)
+            return []
+    
+    async def aget_quotations_by_ids(self, quotation_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several quotations in one query, keyed by ID"""
+        try:
+            return await self._fetch_by_ids('quotations', quotation_ids)
+        except Exception as e:
+            logger.error("Error getting quotations by IDs: %s", e)
+            return {}
+    
+    async def acreate_quotation(self, quotation_data: Dict[str, Any]) -> Optional[str]:
+        """Create a new quotation and return the quotation ID"""
+        try:
+            return await self._insert('quotations', quotation_data)
+        except Exception as e:
+            logger.error("Error creating quotation: %s", e)
+            return None
+    
+    async def aupdate_quotation(self, quotation_id: str, quotation_data: Dict[str, Any]) -> bool:
+        """Update an existing quotation"""
+        try:
+            return await self._update('quotations', quotation_id, quotation_data)
+        except Exception as e:
+            logger.error("Error updating quotation: %s", e)
+            return False
+    
     def get_quotations(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get a list of quotations"""
-        # TODO: Implement PostgreSQL quotation list
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.aget_quotations(limit))
     
-    def get_quotation_by_id(self, quotation_id: str) -> Optional[Dict[str, Any]]:
-        """Get a quotation by its ID"""
-        # TODO: Implement PostgreSQL quotation lookup
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+    def get_quotations_by_ids(self, quotation_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several quotations in one query, keyed by ID"""
+        return self._run(self.aget_quotations_by_ids(quotation_ids))
     
     def create_quotation(self, quotation_data: Dict[str, Any]) -> Optional[str]:
         """Create a new quotation and return the quotation ID"""
-        # TODO: Implement PostgreSQL quotation creation
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.acreate_quotation(quotation_data))
     
     def update_quotation(self, quotation_id: str, quotation_data: Dict[str, Any]) -> bool:
         """Update an existing quotation"""
-        # TODO: Implement PostgreSQL quotation update
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.aupdate_quotation(quotation_id, quotation_data))
     
     # Chat History Management (for AI assistant)
+    def _enqueue_chat_message(self, user_id: str, message: Dict[str, Any]) -> str:
+        """Buffer a chat message for the next COPY flush and return its ID"""
+        owner = _uuid_or_none(user_id)
+        if owner is None:
+            # Caught here rather than at COPY time, where it would fail the whole batch
+            raise ValueError(f"chat_history.user_id must be a user UUID, got {user_id!r}")
+        message_id = uuid.uuid4()
+        record = (
+            message_id,
+            owner,
+            message.get('messageType', message.get('message_type')),
+            message.get('content'),
+            message.get('metadata'),
+            datetime.now(timezone.utc),
+        )
+        with self._chat_buffer_lock:
+            self._chat_buffer.append(record)
+        if self._chat_flush_task is None:
+            self._get_loop().call_soon_threadsafe(self._start_chat_flush)
+        return str(message_id)
+    
+    def _start_chat_flush(self) -> None:
+        """Start the background chat flush loop (runs on the service loop)"""
+        if self._chat_flush_task is None:
+            self._chat_flush_task = asyncio.get_running_loop().create_task(self._chat_flush_loop())
+    
+    async def _chat_flush_loop(self) -> None:
+        """Flush the chat buffer every CHAT_FLUSH_INTERVAL seconds"""
+        while True:
+            await asyncio.sleep(CHAT_FLUSH_INTERVAL)
+            await self._flush_chat_buffer()
+    
+    async def _flush_chat_buffer(self) -> None:
+        """Write every buffered chat message in one binary COPY"""
+        with self._chat_buffer_lock:
+            records, self._chat_buffer = self._chat_buffer, []
+        if not records:
+            return
+        written = 0
+        try:
+            await self.ainitialize()
+            async with self.pool.acquire() as connection:
+                try:
+                    await connection.copy_records_to_table(
+                        'chat_history', records=records, columns=_CHAT_COPY_COLUMNS
+                    )
+                    written = len(records)
+                except Exception as e:
+                    if not _row_rejected(e):
+                        raise
+                    # One bad row fails the whole COPY, so write them one at a time and drop the rejects
+                    logger.warning("Chat COPY of %s messages rejected (%s); retrying row by row", len(records), e)
+                    for record in records:
+                        try:
+                            await connection.copy_records_to_table(
+                                'chat_history', records=[record], columns=_CHAT_COPY_COLUMNS
+                            )
+                        except Exception as row_error:
+                            if not _row_rejected(row_error):
+                                raise
+                            logger.error("Dropping chat message %s for user %s: %s", record[0], record[1], row_error)
+                        written += 1
+        except Exception as e:
+            records = records[written:]
+            logger.error("Error flushing %s chat messages: %s", len(records), e)
+            # Put the unwritten ones back in front of anything queued meanwhile and retry next tick
+            with self._chat_buffer_lock:
+                self._chat_buffer[:0] = records
+                # Drop the oldest messages rather than grow without bound while the database is down
+                del self._chat_buffer[:-CHAT_BUFFER_MAX]
+    
+    async def asave_chat_message(self, user_id: str, message: Dict[str, Any]) -> Optional[str]:
+        """Queue a chat message for the next batched write and return the message ID"""
+        try:
+            return self._enqueue_chat_message(user_id, message)
+        except ValueError as e:
+            logger.error("Rejected chat message: %s", e)
+            return None
+        except Exception as e:
+            logger.error("Error saving chat message: %s", e)
+            return None
+    
+    async def aget_chat_history(self, user_id: str, limit: int = 50, after: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get chat history for a user, oldest first, starting after the message ID after"""
+        try:
+            if not _uuid_list([user_id]):
+                return []
+            await self._flush_chat_buffer()
+            if after is None:
+                return await self._fetch('chat_history', uuid.UUID(user_id), limit)
+            if not _uuid_list([after]):
+                return []
+            return await self._fetch('chat_history_after', uuid.UUID(user_id), uuid.UUID(after), limit)
+        except Exception as e:
+            logger.error("Error getting chat history: %s", e)
+            return []
+    
+    async def aclear_chat_history(self, user_id: str) -> bool:
+        """Clear chat history for a user"""
+        try:
+            await self._flush_chat_buffer()
+            await self._execute("DELETE FROM chat_history WHERE user_id = $1", uuid.UUID(str(user_id)))
+            return True
+        except Exception as e:
+            logger.error("Error clearing chat history: %s", e)
+            return False
+    
+    async def aget_chat_history_columns(self, user_id: str, limit: int = 50) -> Dict[str, List[Any]]:
+        """Get chat history for a user as one list per column"""
+        try:
+            if not _uuid_list([user_id]):
+                return {}
+            await self._flush_chat_buffer()
+            await self.ainitialize()
+            async with self.pool.acquire() as connection:
+                records = await connection.prepared['chat_history'].fetch(uuid.UUID(user_id), limit)
+            return _rows_to_columns(records)
+        except Exception as e:
+            logger.error("Error getting chat history columns: %s", e)
+            return {}
+    
     def save_chat_message(self, user_id: str, message: Dict[str, Any]) -> Optional[str]:
-        """Save a chat message and return the message ID"""
-        # TODO: Implement PostgreSQL chat message storage
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        """Queue a chat message for the next batched write and return the message ID"""
+        try:
+            return self._enqueue_chat_message(user_id, message)
+        except ValueError as e:
+            logger.error("Rejected chat message: %s", e)
+            return None
+        except Exception as e:
+            logger.error("Error saving chat message: %s", e)
+            return None
+    
+    def get_chat_history(self, user_id: str, limit: int = 50, after: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get chat history for a user, oldest first, starting after the message ID after"""
+        return self._run(self.aget_chat_history(user_id, limit, after))
     
-    def get_chat_history(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get chat history for a user"""
-        # TODO: Implement PostgreSQL chat history retrieval
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+    def get_chat_history_columns(self, user_id: str, limit: int = 50) -> Dict[str, List[Any]]:
+        """Get chat history for a user as one list per column"""
+        return self._run(self.aget_chat_history_columns(user_id, limit))
     
     def clear_chat_history(self, user_id: str) -> bool:
         """Clear chat history for a user"""
-        # TODO: Implement PostgreSQL chat history clearing
-        raise NotImplementedError("PostgreSQL implementation coming soon")
+        return self._run(self.aclear_chat_history(user_id))
     
     # Utility Methods
+    async def _server_stats(self) -> Dict[str, Any]:
+        """Read table counts and server I/O settings (cached for STATS_CACHE_TTL seconds)"""
+        stats = self._stats_cache.get('server')
+        if stats is None:
+            stats = dict(await self._fetchrow('table_counts'))
+            stats['ioMethod'] = await self.pool.fetchval("SELECT current_setting('io_method', true)")
+            # pg_stat_io exists from PostgreSQL 16
+            if int(await self.pool.fetchval("SHOW server_version_num")) >= 160000:
+                stats['ioReads'] = _plain(await self.pool.fetchval("SELECT sum(reads) FROM pg_stat_io"))
+            stats['preparedStatements'] = await self.pool.fetchval("SELECT count(*) FROM pg_prepared_statements")
+            self._stats_cache.set('server', stats)
+        return stats
+    
+    async def aget_database_stats(self) -> Dict[str, Any]:
+        """Get database statistics for debugging"""
+        try:
+            await self.ainitialize()
+            return {
+                'database_type': 'PostgreSQL',
+                'connected': self._ping_fresh(),
+                'poolSize': self.pool.get_size(),
+                'poolIdle': self.pool.get_idle_size(),
+                'poolMax': self.pool.get_max_size(),
+                'lastPingAge': time.monotonic() - self._last_ping_ok,
+                **await self._server_stats(),
+            }
+        except Exception as e:
+            logger.error("Error getting database stats: %s", e)
+            return {
+                'database_type': 'PostgreSQL',
+                'connected': False,
+                'error': str(e)
+            }
+    
+    async def ahealth_check(self) -> bool:
+        """Check if the database connection is healthy"""
+        try:
+            await self.ainitialize()
+            return self._ping_fresh()
+        except Exception as e:
+            logger.error("PostgreSQL health check failed: %s", e)
+            return False
+    
     def get_database_stats(self) -> Dict[str, Any]:
         """Get database statistics for debugging"""
-        # TODO: Implement PostgreSQL stats
-        return {
-            'database_type': 'PostgreSQL',
-            'connected': False,
-            'error': 'PostgreSQL implementation not yet available'
-        }
+        return self._run(self.aget_database_stats())
     
     def health_check(self) -> bool:
         """Check if the database connection is healthy"""
-        # TODO: Implement PostgreSQL health check
-        return False
+        # Once the pool is up this is answered from the ping loop without a loop hop
+        if self.pool is not None:
+            return self._ping_fresh()
+        return self._run(self.ahealth_check())
 
 
 # PostgreSQL Table Schema Documentation
@@ -262,6 +1171,8 @@ class PostgreSQLDatabaseService(DatabaseService):
 #   - status (VARCHAR) -- 'available', 'in_use', 'maintenance'
 #   - created_at (TIMESTAMP)
 #   - updated_at (TIMESTAMP)
+#   - search_tsv (TSVECTOR GENERATED ALWAYS AS
+#       (to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, ''))) STORED)
 # 
 # jobs:
 #   - id (UUID PRIMARY KEY)
@@ -309,3 +1220,9 @@ class PostgreSQLDatabaseService(DatabaseService):
 #   - status (VARCHAR) -- 'available', 'busy', 'off_duty'
 #   - created_at (TIMESTAMP)
 #   - updated_at (TIMESTAMP)
+# 
+# Indexes for the status filters this service issues (partial, so they only hold the hot rows):
+#   CREATE INDEX equipment_available_idx ON equipment(name) WHERE status = 'available';
+#   CREATE INDEX jobs_pending_idx ON jobs(start_date) WHERE status = 'pending';
+#   CREATE INDEX leads_new_idx ON leads(created_at DESC) WHERE status = 'new';
+#   CREATE INDEX equipment_search_idx ON equipment USING GIN (search_tsv);
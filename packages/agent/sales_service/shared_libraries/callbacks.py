@@ -14,6 +14,7 @@
 
 """Callback functions for FOMC Research Agent."""
 
+import asyncio
 import logging
 import time
 import json
@@ -36,7 +37,7 @@ RATE_LIMIT_SECS = 60
 RPM_QUOTA = 10
 
 
-def rate_limit_callback(
+async def rate_limit_callback(
     callback_context: CallbackContext, llm_request: LlmRequest
 ) -> None:
     """Callback function that implements a query rate limit.
@@ -80,7 +81,8 @@ def rate_limit_callback(
         delay = RATE_LIMIT_SECS - elapsed_secs + 1
         if delay > 0:
             logger.debug("Sleeping for %i seconds", delay)
-            time.sleep(delay)
+            # Awaited, so the shared agent loop keeps serving other chats meanwhile
+            await asyncio.sleep(delay)
         callback_context.state["timer_start"] = now
         callback_context.state["request_count"] = 1
     else:
@@ -83,7 +83,7 @@ def capture_lead_information(
     
     # Sync with CRM
     crm_sync_result = crm_sync.sync_lead(lead_details)
-    crm_status = "CRM sync successful" if crm_sync_result else "CRM sync failed"
+    crm_status = "Queued for CRM sync" if crm_sync_result else "CRM sync failed"
     
     return {
         "status": "success",
@@ -28,6 +28,9 @@ export const signUp = async (
       name,
       email,
       role,
+      // Lowercase copies used by the agent for indexed name/email lookups
+      nameLower: name.toLowerCase(),
+      emailLower: email.toLowerCase(),
       createdAt: serverTimestamp(),
     };
 
@@ -55,6 +55,9 @@ const createInitialUser = async (
       name,
       email,
       role,
+      // Lowercase copies used by the agent for indexed name/email lookups
+      nameLower: name.toLowerCase(),
+      emailLower: email.toLowerCase(),
       createdAt: serverTimestamp(),
     };
 